@@ -11,65 +11,876 @@
 
 # Importing sqlite3.
 import sqlite3
-
-# Function to create the database and tables if they do not exist.
-def create_database_and_tables():
-    try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS expense (
+# Importing datetime to work out budget periods.
+import datetime
+# Importing array to hold records compactly in memory.
+import array
+# Importing abc to describe what every storage backend must provide.
+import abc
+# Importing math to measure how unusual an amount is.
+import math
+# Importing hashlib, json and zlib to identify records and save compact sync files.
+import hashlib
+import json
+import zlib
+# Importing os to check backup file names.
+import os
+# Importing queue and threading to run the full-screen view's queries in the background.
+import queue
+import threading
+# Importing time to show how long database updates take.
+import time
+# Importing curses for the full-screen view. It does not come with Python on Windows.
+try:
+    import curses
+except ImportError:
+    curses = None
+
+# Function to add a column to a table if it is not there yet (used by migrations).
+def add_column(cursor, table, column, definition):
+    cursor.execute(f'PRAGMA table_info({table})')
+    if column not in [info[1] for info in cursor.fetchall()]:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+# Number of rows a migration fills in at a time, so only that many are held in
+# memory at once however large the table is.
+MIGRATION_BATCH_SIZE = 50000
+
+
+# Function to go through a table in ranges of IDs, for migrations that fill in
+# values for every existing row. Gives the IDs just before and at the end of
+# each range, and prints progress after each one if the table takes more than one.
+def id_ranges(cursor, table):
+    batch_size = MIGRATION_BATCH_SIZE
+    total_rows, last_id = cursor.execute(f'SELECT COUNT(*), MIN(id) - 1 FROM {table}').fetchone()
+    done_rows = 0
+    while done_rows < total_rows:
+        batch_rows, batch_end = cursor.execute(f'''SELECT COUNT(*), MAX(id) FROM (SELECT id FROM {table}
+                                                WHERE id > ? ORDER BY id LIMIT ?)''', (last_id, batch_size)).fetchone()
+        if not batch_rows:
+            break
+        yield last_id, batch_end
+        done_rows += batch_rows
+        last_id = batch_end
+        if total_rows > batch_size:
+            print(f'  {done_rows} of {total_rows} rows in {table} done.')
+
+
+# Function to create the triggers that record every local change to a synced table.
+# Each change takes the next logical clock value and change number from sync_state,
+# and deletions leave a tombstone behind so they can be passed on to other devices.
+# The triggers are switched off while changes from another device are being applied.
+def create_sync_triggers(cursor, table, columns):
+    for action in ('insert', 'update', 'delete'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {table}_sync_{action}')
+    cursor.execute(f'''CREATE TRIGGER {table}_sync_insert AFTER INSERT ON {table}
+                    WHEN (SELECT applying FROM sync_state) = 0
+                    BEGIN
+                        UPDATE sync_state SET clock = clock + 1, seq = seq + 1;
+                        UPDATE {table} SET row_uuid = COALESCE(NEW.row_uuid, lower(hex(randomblob(16)))),
+                                           clock = (SELECT clock FROM sync_state),
+                                           device = (SELECT device FROM sync_state),
+                                           seq = (SELECT seq FROM sync_state)
+                        WHERE id = NEW.id;
+                    END''')
+    cursor.execute(f'''CREATE TRIGGER {table}_sync_update AFTER UPDATE OF {', '.join(columns)} ON {table}
+                    WHEN (SELECT applying FROM sync_state) = 0
+                    BEGIN
+                        UPDATE sync_state SET clock = clock + 1, seq = seq + 1;
+                        UPDATE {table} SET clock = (SELECT clock FROM sync_state),
+                                           device = (SELECT device FROM sync_state),
+                                           seq = (SELECT seq FROM sync_state)
+                        WHERE id = NEW.id;
+                    END''')
+    cursor.execute(f'''CREATE TRIGGER {table}_sync_delete AFTER DELETE ON {table}
+                    WHEN (SELECT applying FROM sync_state) = 0
+                    BEGIN
+                        UPDATE sync_state SET clock = clock + 1, seq = seq + 1;
+                        INSERT OR REPLACE INTO tombstones (table_name, row_uuid, clock, device, seq)
+                        SELECT '{table}', OLD.row_uuid, clock, device, seq FROM sync_state;
+                    END''')
+
+
+# Function to work out the sync ID of a record that existed before syncing was added.
+# It comes from the record's contents, so copies of the same database made before
+# then give the record the same ID and it is not duplicated on their first sync.
+def content_row_uuid(table, row):
+    return hashlib.sha1(json.dumps([table] + list(row)).encode('utf-8')).hexdigest()[:32]
+
+
+# Function to start tracking changes for syncing (migration 3).
+# Existing records are given an ID made from their contents, and no device, so
+# they are the same in every copy of the database.
+def add_sync_tracking(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS sync_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    device TEXT,
+                    clock INTEGER,
+                    seq INTEGER,
+                    applying INTEGER
+                    )''')
+    cursor.execute('''INSERT OR IGNORE INTO sync_state (id, device, clock, seq, applying)
+                    VALUES (1, lower(hex(randomblob(16))), 1, 1, 0)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS tombstones (
+                    table_name TEXT,
+                    row_uuid TEXT,
+                    clock INTEGER,
+                    device TEXT,
+                    seq INTEGER,
+                    PRIMARY KEY (table_name, row_uuid)
+                    )''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS tombstones_seq ON tombstones (seq)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS sync_peers (
+                    device TEXT PRIMARY KEY,
+                    received_seq INTEGER DEFAULT 0,
+                    acked_seq INTEGER DEFAULT 0
+                    )''')
+    tracked_columns = {
+        'expense': ('category', 'amount', 'date'),
+        'income': ('category', 'amount', 'date'),
+        'budgets': ('category', 'budget'),
+        'goals': ('goal', 'amount', 'date'),
+    }
+    for table, columns in tracked_columns.items():
+        add_column(cursor, table, 'row_uuid', 'TEXT')
+        add_column(cursor, table, 'clock', 'INTEGER')
+        add_column(cursor, table, 'device', 'TEXT')
+        add_column(cursor, table, 'seq', 'INTEGER')
+        for first_id, last_id in id_ranges(cursor, table):
+            rows = cursor.execute(f'''SELECT id, {', '.join(columns)} FROM {table}
+                                  WHERE id > ? AND id <= ? AND row_uuid IS NULL''', (first_id, last_id)).fetchall()
+            cursor.executemany(f'''UPDATE {table} SET row_uuid = ?, clock = 1, device = '', seq = 1 WHERE id = ?''',
+                               [(content_row_uuid(table, row), row[0]) for row in rows])
+        cursor.execute(f'''CREATE UNIQUE INDEX IF NOT EXISTS {table}_row_uuid ON {table} (row_uuid)''')
+        cursor.execute(f'''CREATE INDEX IF NOT EXISTS {table}_seq ON {table} (seq)''')
+        create_sync_triggers(cursor, table, columns)
+
+
+# Function to create the triggers that keep category_stats up to date. Each
+# insert, update or delete adjusts the running count, mean and sum of squared
+# differences the same way add_to_stats() and remove_from_stats() do.
+def create_stats_triggers(cursor, kind):
+    add = f'''INSERT OR IGNORE INTO category_stats (kind, category, count, mean, m2) VALUES ('{kind}', NEW.category, 0, 0.0, 0.0);
+              UPDATE category_stats SET count = count + 1,
+                                        mean = mean + (NEW.amount - mean) / (count + 1),
+                                        m2 = m2 + (NEW.amount - mean) * (NEW.amount - (mean + (NEW.amount - mean) / (count + 1)))
+              WHERE kind = '{kind}' AND category IS NEW.category;'''
+    remove = f'''UPDATE category_stats SET
+                     mean = CASE WHEN count > 1 THEN (mean * count - OLD.amount) / (count - 1) ELSE 0.0 END,
+                     m2 = CASE WHEN count > 1
+                          THEN MAX(m2 - (OLD.amount - mean) * (OLD.amount - (mean * count - OLD.amount) / (count - 1)), 0.0)
+                          ELSE 0.0 END,
+                     count = MAX(count - 1, 0)
+                 WHERE kind = '{kind}' AND category IS OLD.category;'''
+    for action in ('insert', 'update', 'delete'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {kind}_stats_{action}')
+    cursor.execute(f'''CREATE TRIGGER {kind}_stats_insert AFTER INSERT ON {kind}
+                    BEGIN {add} END''')
+    cursor.execute(f'''CREATE TRIGGER {kind}_stats_update AFTER UPDATE OF category, amount ON {kind}
+                    BEGIN {remove} {add} END''')
+    cursor.execute(f'''CREATE TRIGGER {kind}_stats_delete AFTER DELETE ON {kind}
+                    BEGIN {remove} END''')
+
+
+# Function to start keeping running statistics of the amounts in each category (migration 6).
+def add_category_stats(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS category_stats (
+                    kind TEXT,
+                    category TEXT,
+                    count INTEGER,
+                    mean REAL,
+                    m2 REAL,
+                    PRIMARY KEY (kind, category)
+                    )''')
+    for kind in ('expense', 'income'):
+        # Works out the statistics of each range of records, and combines them
+        # with those of the ranges before it (Chan's method).
+        stats = {}
+        for first_id, last_id in id_ranges(cursor, kind):
+            batch = cursor.execute(f'''SELECT records.category, COUNT(*), averages.mean,
+                                           SUM((records.amount - averages.mean) * (records.amount - averages.mean))
+                                    FROM {kind} AS records
+                                    JOIN (SELECT category, AVG(amount) AS mean FROM {kind}
+                                          WHERE id > ? AND id <= ? AND amount IS NOT NULL
+                                          GROUP BY category) AS averages
+                                    ON records.category IS averages.category
+                                    WHERE records.id > ? AND records.id <= ? AND records.amount IS NOT NULL
+                                    GROUP BY records.category''', (first_id, last_id, first_id, last_id)).fetchall()
+            for category, count, mean, m2 in batch:
+                total = stats.setdefault(category, [0, 0.0, 0.0])
+                combined_count = total[0] + count
+                delta = mean - total[1]
+                total[2] += m2 + delta * delta * total[0] * count / combined_count
+                total[1] += delta * count / combined_count
+                total[0] = combined_count
+        cursor.execute('''DELETE FROM category_stats WHERE kind = ?''', (kind,))
+        cursor.executemany('''INSERT INTO category_stats (kind, category, count, mean, m2) VALUES (?, ?, ?, ?, ?)''',
+                           [(kind, category, count, mean, m2) for category, (count, mean, m2) in stats.items()])
+        create_stats_triggers(cursor, kind)
+
+
+# Schema migrations, applied in order to bring any database up to date.
+# The number of the last migration applied is stored in PRAGMA user_version,
+# so on a normal start only the version needs to be read.
+# Each step is either an SQL statement or a function that takes the cursor.
+MIGRATIONS = [
+    (1, 'Create expense, income, budgets and goals tables', [
+        '''CREATE TABLE IF NOT EXISTS expense (
                         id INTEGER PRIMARY KEY,
                         category TEXT,
                         amount REAL,
                         date TEXT
-                        )''')
-
-        cursor.execute('''CREATE TABLE IF NOT EXISTS income (
+                        )''',
+        '''CREATE TABLE IF NOT EXISTS income (
                         id INTEGER PRIMARY KEY,
                         category TEXT,
                         amount REAL,
                         date TEXT
-                        )''')
-
-        cursor.execute('''CREATE TABLE IF NOT EXISTS budgets (
+                        )''',
+        '''CREATE TABLE IF NOT EXISTS budgets (
                         id INTEGER PRIMARY KEY,
                         category TEXT UNIQUE,
                         budget REAL
-                        )''')
-
-        cursor.execute('''CREATE TABLE IF NOT EXISTS goals (
+                        )''',
+        '''CREATE TABLE IF NOT EXISTS goals (
                         id INTEGER PRIMARY KEY,
                         goal TEXT UNIQUE,
                         amount REAL,
                         date TEXT
-                        )''')
-        
-        db.commit()
+                        )''',
+    ]),
+    (2, 'Add category and date indexes', [
+        '''CREATE INDEX IF NOT EXISTS expense_lower_category ON expense (LOWER(category))''',
+        '''CREATE INDEX IF NOT EXISTS expense_category_date ON expense (category, date)''',
+        '''CREATE INDEX IF NOT EXISTS income_lower_category ON income (LOWER(category))''',
+        '''CREATE INDEX IF NOT EXISTS income_category_date ON income (category, date)''',
+    ]),
+    (3, 'Track changes for syncing between devices', [
+        add_sync_tracking,
+    ]),
+    (4, 'Add weekly, monthly and yearly budget periods', [
+        lambda cursor: add_column(cursor, 'budgets', 'period', "TEXT NOT NULL DEFAULT 'monthly'"),
+        lambda cursor: add_column(cursor, 'budgets', 'rollover', 'INTEGER NOT NULL DEFAULT 0'),
+        lambda cursor: create_sync_triggers(cursor, 'budgets', ('category', 'budget', 'period', 'rollover')),
+    ]),
+    (5, 'Add indexes for sorting by date and amount', [
+        '''CREATE INDEX IF NOT EXISTS expense_date ON expense (date)''',
+        '''CREATE INDEX IF NOT EXISTS expense_amount ON expense (amount)''',
+        '''CREATE INDEX IF NOT EXISTS income_date ON income (date)''',
+        '''CREATE INDEX IF NOT EXISTS income_amount ON income (amount)''',
+    ]),
+    (6, 'Keep running statistics of the amounts in each category', [
+        add_category_stats,
+    ]),
+    # The sync triggers are updated first, so filling in the dates counts as a
+    # change and the date from the last device to upgrade is synced to all of them.
+    (7, 'Record when each budget took effect', [
+        lambda cursor: add_column(cursor, 'budgets', 'started', 'TEXT'),
+        lambda cursor: create_sync_triggers(cursor, 'budgets', ('category', 'budget', 'period', 'rollover', 'started')),
+        '''UPDATE budgets SET started = date('now', 'localtime') WHERE started IS NULL''',
+    ]),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# Function to apply every migration newer than the database's current version.
+# Each migration runs in its own transaction together with the version bump, so an
+# interrupted update leaves the database at the last completed version and is
+# picked up from there on the next start.
+def migrate_database(db, current_version):
+    pending = [migration for migration in MIGRATIONS if migration[0] > current_version]
+    isolation_level = db.isolation_level
+    db.isolation_level = None
+    cursor = db.cursor()
+    try:
+        for number, (version, description, steps) in enumerate(pending, start=1):
+            print(f'\nUpdating database ({number}/{len(pending)}): {description}...')
+            start_time = time.perf_counter()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(f'PRAGMA user_version = {version}')
+                cursor.execute('COMMIT')
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+            print(f'Done in {time.perf_counter() - start_time:.2f} seconds.')
+    finally:
+        db.isolation_level = isolation_level
+
+
+# Function to create the database and tables if they do not exist, and to bring
+# an existing database up to the latest schema version.
+def create_database_and_tables(database='expense_budget_app.db'):
+    try:
+        db = sqlite3.connect(database)
+        current_version = db.execute('PRAGMA user_version').fetchone()[0]
+        if current_version == 0:
+            # Lets the database be compacted in small steps later on. This only
+            # takes effect on a new database, before any tables are created.
+            db.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        if current_version < LATEST_SCHEMA_VERSION:
+            migrate_database(db, current_version)
     except sqlite3.Error as error:
         print('Error:', error)
     finally:
         db.close()
 
 
-# Function to populate initial values if needed.
-def populate_initial_values():
+# Kinds of records that are stored with a category, amount and date.
+RECORD_KINDS = ('expense', 'income')
+RECORD_FIELDS = ('category', 'amount', 'date')
+
+
+# Error raised by every storage backend when a change cannot be made,
+# for example when a goal is renamed to the title of another goal.
+class StorageError(Exception):
+    pass
+
+
+# Class describing what every storage backend provides to the menu options.
+# Expenses and income are returned as (id, category, amount, date), budgets as
+# (category, budget, period, rollover, started) and goals as (id, goal, amount, date).
+# A budget's started date is when it took effect, and only moves when its period changes.
+# It can be None for a budget synced from a device that has not recorded it yet.
+# Categories passed to get, update and delete are matched ignoring case, the
+# same as the menu options have always done.
+class Storage(abc.ABC):
+    @abc.abstractmethod
+    def add_record(self, kind, category, amount, date):
+        pass
+
+    @abc.abstractmethod
+    def get_record(self, kind, record_id):
+        pass
+
+    @abc.abstractmethod
+    def list_records(self, kind, category=None):
+        pass
+
+    @abc.abstractmethod
+    def update_record(self, kind, record_id, field, value):
+        pass
+
+    @abc.abstractmethod
+    def delete_record(self, kind, record_id):
+        pass
+
+    @abc.abstractmethod
+    def total(self, kind):
+        pass
+
+    # Total for one category (matched exactly) from the start date up to, but not including, the end date.
+    @abc.abstractmethod
+    def total_in_period(self, kind, category, start, end):
+        pass
+
+    @abc.abstractmethod
+    def set_budget(self, category, budget, period='monthly', rollover=0, started=None):
+        pass
+
+    @abc.abstractmethod
+    def get_budget(self, category):
+        pass
+
+    @abc.abstractmethod
+    def list_budgets(self):
+        pass
+
+    @abc.abstractmethod
+    def update_budget(self, category, budget, period, rollover, started=None):
+        pass
+
+    @abc.abstractmethod
+    def delete_budget(self, category):
+        pass
+
+    @abc.abstractmethod
+    def set_goal(self, goal, amount, date):
+        pass
+
+    @abc.abstractmethod
+    def get_goal(self, goal_id):
+        pass
+
+    @abc.abstractmethod
+    def list_goals(self):
+        pass
+
+    @abc.abstractmethod
+    def update_goal(self, goal_id, goal=None, amount=None, date=None):
+        pass
+
+    @abc.abstractmethod
+    def delete_goal(self, goal_id):
+        pass
+
+    @abc.abstractmethod
+    def total_goals(self):
+        pass
+
+    # Records with the same category (matched exactly) and amount, dated up to the given number of days either side.
+    @abc.abstractmethod
+    def find_similar_records(self, kind, category, amount, date, window_days):
+        pass
+
+    # Running (count, mean, sum of squared differences from the mean) of the amounts in one category.
+    @abc.abstractmethod
+    def category_stats(self, kind, category):
+        pass
+
+    def close(self):
+        pass
+
+
+# Function to check a record kind and field before they are put into SQL.
+def check_record_field(kind, field=None):
+    if kind not in RECORD_KINDS:
+        raise ValueError(f"Unknown record kind '{kind}'.")
+    if field is not None and field not in RECORD_FIELDS:
+        raise ValueError(f"Unknown field '{field}'.")
+
+
+# Function to work out the first and last dates within a number of days of a date.
+# Dates that are not in YYYY-MM-DD form only match themselves.
+def date_window(date, days):
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
+        day = datetime.date.fromisoformat(date)
+    except (TypeError, ValueError):
+        return date, date
+    return (day - datetime.timedelta(days=days)).isoformat(), (day + datetime.timedelta(days=days)).isoformat()
 
-        # Add initial values to tables if needed.
 
-        db.commit()
-    except sqlite3.Error as error:
-        print('Error:', error)
-    finally:
-        db.close()
+# Functions to add a value to, or take one away from, running statistics kept as
+# [count, mean, sum of squared differences from the mean] (Welford's method).
+# Each takes the same time however many values have been added.
+def add_to_stats(stats, value):
+    stats[0] += 1
+    delta = value - stats[1]
+    stats[1] += delta / stats[0]
+    stats[2] += delta * (value - stats[1])
+
+
+def remove_from_stats(stats, value):
+    if stats[0] <= 1:
+        stats[:] = [0, 0.0, 0.0]
+        return
+    mean = (stats[1] * stats[0] - value) / (stats[0] - 1)
+    stats[2] = max(stats[2] - (value - stats[1]) * (value - mean), 0.0)
+    stats[1] = mean
+    stats[0] -= 1
+
+
+# Class storing everything in the SQLite database file, through one connection
+# that stays open until close() is called.
+class SQLiteStorage(Storage):
+    def __init__(self, database='expense_budget_app.db'):
+        try:
+            self.db = sqlite3.connect(database)
+        except sqlite3.Error as error:
+            raise StorageError(str(error)) from error
+
+    # Function to run one statement, committing it if it changes anything.
+    def execute(self, sql, parameters=(), commit=False):
+        try:
+            cursor = self.db.execute(sql, parameters)
+            if commit:
+                self.db.commit()
+            return cursor
+        except sqlite3.Error as error:
+            self.db.rollback()
+            raise StorageError(str(error)) from error
+
+    def add_record(self, kind, category, amount, date):
+        check_record_field(kind)
+        return self.execute(f'''INSERT INTO {kind} (category, amount, date)
+                            VALUES (?, ?, ?)''', (category, amount, date), commit=True).lastrowid
+
+    def get_record(self, kind, record_id):
+        check_record_field(kind)
+        return self.execute(f'''SELECT id, category, amount, date FROM {kind} WHERE id = ?''', (record_id,)).fetchone()
+
+    def list_records(self, kind, category=None):
+        check_record_field(kind)
+        if category is None:
+            return self.execute(f'''SELECT id, category, amount, date FROM {kind} ORDER BY id''').fetchall()
+        return self.execute(f'''SELECT id, category, amount, date FROM {kind}
+                            WHERE LOWER(category) = ? ORDER BY id''', (category.lower(),)).fetchall()
+
+    def update_record(self, kind, record_id, field, value):
+        check_record_field(kind, field)
+        return self.execute(f'''UPDATE {kind} SET {field} = ? WHERE id = ?''', (value, record_id), commit=True).rowcount > 0
+
+    def delete_record(self, kind, record_id):
+        check_record_field(kind)
+        return self.execute(f'''DELETE FROM {kind} WHERE id = ?''', (record_id,), commit=True).rowcount > 0
+
+    def total(self, kind):
+        check_record_field(kind)
+        return self.execute(f'''SELECT COALESCE(SUM(amount), 0) FROM {kind}''').fetchone()[0]
+
+    # Only reads the rows in the date range, using the category and date index.
+    def total_in_period(self, kind, category, start, end):
+        check_record_field(kind)
+        return self.execute(f'''SELECT COALESCE(SUM(amount), 0) FROM {kind}
+                            WHERE category = ? AND date >= ? AND date < ?''',
+                            (category, start.isoformat(), end.isoformat())).fetchone()[0]
+
+    def set_budget(self, category, budget, period='monthly', rollover=0, started=None):
+        started = (started or datetime.date.today()).isoformat()
+        self.execute('''INSERT INTO budgets (category, budget, period, rollover, started)
+                     VALUES (?, ?, ?, ?, ?)
+                     ON CONFLICT (category) DO UPDATE SET budget = excluded.budget, period = excluded.period,
+                     rollover = excluded.rollover,
+                     started = CASE WHEN budgets.period = excluded.period AND budgets.started IS NOT NULL
+                                    THEN budgets.started ELSE excluded.started END''',
+                     (category, budget, period, rollover, started), commit=True)
+
+    def get_budget(self, category):
+        return self.execute('''SELECT category, budget, period, rollover, started FROM budgets
+                            WHERE LOWER(category) = ?''', (category.lower(),)).fetchone()
+
+    def list_budgets(self):
+        return self.execute('''SELECT category, budget, period, rollover, started FROM budgets ORDER BY category''').fetchall()
+
+    def update_budget(self, category, budget, period, rollover, started=None):
+        started = (started or datetime.date.today()).isoformat()
+        return self.execute('''UPDATE budgets SET budget = ?, period = ?, rollover = ?,
+                            started = CASE WHEN period = ? AND started IS NOT NULL THEN started ELSE ? END
+                            WHERE LOWER(category) = ?''',
+                            (budget, period, rollover, period, started, category.lower()), commit=True).rowcount > 0
+
+    def delete_budget(self, category):
+        return self.execute('''DELETE FROM budgets WHERE LOWER(category) = ?''', (category.lower(),), commit=True).rowcount > 0
+
+    def set_goal(self, goal, amount, date):
+        self.execute('''INSERT INTO goals (goal, amount, date)
+                     VALUES (?, ?, ?)
+                     ON CONFLICT (goal) DO UPDATE SET amount = excluded.amount, date = excluded.date''',
+                     (goal, amount, date), commit=True)
+
+    def get_goal(self, goal_id):
+        return self.execute('''SELECT id, goal, amount, date FROM goals WHERE id = ?''', (goal_id,)).fetchone()
+
+    def list_goals(self):
+        return self.execute('''SELECT id, goal, amount, date FROM goals ORDER BY id''').fetchall()
+
+    # Only the values given are changed, all in one transaction.
+    def update_goal(self, goal_id, goal=None, amount=None, date=None):
+        changes = [(field, value) for field, value in (('goal', goal), ('amount', amount), ('date', date))
+                   if value is not None]
+        if not changes:
+            return self.get_goal(goal_id) is not None
+        assignments = ', '.join(f'{field} = ?' for field, value in changes)
+        return self.execute(f'''UPDATE goals SET {assignments} WHERE id = ?''',
+                            tuple(value for field, value in changes) + (goal_id,), commit=True).rowcount > 0
+
+    def delete_goal(self, goal_id):
+        return self.execute('''DELETE FROM goals WHERE id = ?''', (goal_id,), commit=True).rowcount > 0
+
+    def total_goals(self):
+        return self.execute('''SELECT COALESCE(SUM(amount), 0) FROM goals''').fetchone()[0]
+
+    # Looks up the date range on the category and date index.
+    def find_similar_records(self, kind, category, amount, date, window_days):
+        check_record_field(kind)
+        first, last = date_window(date, window_days)
+        return self.execute(f'''SELECT id, category, amount, date FROM {kind}
+                            WHERE category = ? AND date >= ? AND date <= ? AND amount = ?
+                            ORDER BY id''', (category, first, last, amount)).fetchall()
+
+    # Kept up to date by triggers on every insert, update and delete.
+    def category_stats(self, kind, category):
+        check_record_field(kind)
+        stats = self.execute('''SELECT count, mean, m2 FROM category_stats
+                             WHERE kind = ? AND category = ?''', (kind, category)).fetchone()
+        return tuple(stats) if stats else (0, 0.0, 0.0)
+
+    def close(self):
+        self.db.close()
+
+
+# Class holding one kind of record in memory as columns: IDs and amounts in
+# typed arrays, categories and dates in lists. Deleted records leave a gap that
+# is no longer listed in the positions dictionary. Records are also indexed by
+# lowercase category and by date, and a running total is kept.
+class MemoryRecords:
+    __slots__ = ('ids', 'categories', 'amounts', 'dates', 'positions', 'by_category', 'by_date', 'by_amount',
+                 'stats', 'next_id', 'total')
+
+    def __init__(self):
+        self.ids = array.array('q')
+        self.categories = []
+        self.amounts = array.array('d')
+        self.dates = []
+        # Record ID -> position in the columns, in the order records were added.
+        self.positions = {}
+        # Lowercase category or date -> positions, kept as dictionaries so removing one is quick.
+        self.by_category = {}
+        self.by_date = {}
+        # (Category, amount) -> positions, for finding duplicates.
+        self.by_amount = {}
+        # Category -> running statistics of its amounts.
+        self.stats = {}
+        self.next_id = 1
+        self.total = 0.0
+
+    def row(self, position):
+        return (self.ids[position], self.categories[position], self.amounts[position], self.dates[position])
+
+    def index(self, position):
+        category = self.categories[position]
+        self.by_category.setdefault(str(category).lower(), {})[position] = None
+        self.by_date.setdefault(self.dates[position], {})[position] = None
+        self.by_amount.setdefault((category, self.amounts[position]), {})[position] = None
+        add_to_stats(self.stats.setdefault(category, [0, 0.0, 0.0]), self.amounts[position])
+
+    def unindex(self, position):
+        category = self.categories[position]
+        for index, key in ((self.by_category, str(category).lower()), (self.by_date, self.dates[position]),
+                           (self.by_amount, (category, self.amounts[position]))):
+            positions = index[key]
+            del positions[position]
+            if not positions:
+                del index[key]
+        remove_from_stats(self.stats[category], self.amounts[position])
+        if self.stats[category][0] == 0:
+            del self.stats[category]
+
+
+# Class for a budget held in memory.
+class BudgetRecord:
+    __slots__ = ('category', 'budget', 'period', 'rollover', 'started')
+
+    def __init__(self, category, budget, period, rollover, started):
+        self.category = category
+        self.budget = budget
+        self.period = period
+        self.rollover = rollover
+        self.started = started
+
+    def row(self):
+        return (self.category, self.budget, self.period, self.rollover, self.started)
+
+    def change(self, budget, period, rollover, started):
+        if period != self.period or self.started is None:
+            self.started = started
+        self.budget, self.period, self.rollover = budget, period, rollover
+
+
+# Class for a financial goal held in memory.
+class GoalRecord:
+    __slots__ = ('id', 'goal', 'amount', 'date')
+
+    def __init__(self, goal_id, goal, amount, date):
+        self.id = goal_id
+        self.goal = goal
+        self.amount = amount
+        self.date = date
+
+    def row(self):
+        return (self.id, self.goal, self.amount, self.date)
+
+
+# Function to turn an ID typed in by the user into a number, or None if it is not one.
+def parse_record_id(record_id):
+    try:
+        return int(record_id)
+    except (TypeError, ValueError):
+        return None
+
+
+# Class storing everything in memory, for tests and for using the app's data
+# handling from other programs. Nothing is saved when the program ends.
+class MemoryStorage(Storage):
+    def __init__(self):
+        self.records = {kind: MemoryRecords() for kind in RECORD_KINDS}
+        # Category -> budget, and goal ID -> goal.
+        self.budgets = {}
+        self.goals = {}
+        self.next_goal_id = 1
+
+    def add_record(self, kind, category, amount, date):
+        check_record_field(kind)
+        records = self.records[kind]
+        record_id = records.next_id
+        records.next_id += 1
+        records.ids.append(record_id)
+        records.categories.append(category)
+        records.amounts.append(amount)
+        records.dates.append(date)
+        position = len(records.ids) - 1
+        records.positions[record_id] = position
+        records.index(position)
+        records.total += amount
+        return record_id
+
+    def get_record(self, kind, record_id):
+        check_record_field(kind)
+        records = self.records[kind]
+        position = records.positions.get(parse_record_id(record_id))
+        return None if position is None else records.row(position)
+
+    def list_records(self, kind, category=None):
+        check_record_field(kind)
+        records = self.records[kind]
+        if category is None:
+            return [records.row(position) for position in records.positions.values()]
+        positions = sorted(records.by_category.get(category.lower(), ()))
+        return [records.row(position) for position in positions]
+
+    def update_record(self, kind, record_id, field, value):
+        check_record_field(kind, field)
+        records = self.records[kind]
+        position = records.positions.get(parse_record_id(record_id))
+        if position is None:
+            return False
+        records.unindex(position)
+        if field == 'amount':
+            records.total += value - records.amounts[position]
+            records.amounts[position] = value
+        else:
+            (records.categories if field == 'category' else records.dates)[position] = value
+        records.index(position)
+        return True
+
+    def delete_record(self, kind, record_id):
+        check_record_field(kind)
+        records = self.records[kind]
+        position = records.positions.pop(parse_record_id(record_id), None)
+        if position is None:
+            return False
+        records.unindex(position)
+        records.total -= records.amounts[position]
+        return True
+
+    def total(self, kind):
+        check_record_field(kind)
+        records = self.records[kind]
+        # Starts again from zero when empty, so rounding errors do not build up.
+        if not records.positions:
+            records.total = 0.0
+        return records.total
+
+    # Looks through whichever is smaller: the days in the range, or the category's records.
+    def total_in_period(self, kind, category, start, end):
+        check_record_field(kind)
+        records = self.records[kind]
+        in_category = records.by_category.get(category.lower(), {})
+        days = (end - start).days
+        if days < len(in_category):
+            positions = [position for offset in range(days)
+                         for position in records.by_date.get((start + datetime.timedelta(days=offset)).isoformat(), ())
+                         if records.categories[position] == category]
+        else:
+            start_text, end_text = start.isoformat(), end.isoformat()
+            positions = [position for position in in_category
+                         if records.categories[position] == category
+                         and start_text <= str(records.dates[position]) < end_text]
+        return sum(records.amounts[position] for position in positions)
+
+    # Budgets are matched ignoring case, the same as LOWER(category) = ? in SQL.
+    def matching_budgets(self, category):
+        return [budget for budget in self.budgets.values() if budget.category.lower() == category.lower()]
+
+    def set_budget(self, category, budget, period='monthly', rollover=0, started=None):
+        started = (started or datetime.date.today()).isoformat()
+        existing = self.budgets.get(category)
+        if existing is None:
+            self.budgets[category] = BudgetRecord(category, budget, period, rollover, started)
+        else:
+            existing.change(budget, period, rollover, started)
+
+    def get_budget(self, category):
+        budgets = self.matching_budgets(category)
+        return budgets[0].row() if budgets else None
+
+    def list_budgets(self):
+        return sorted(budget.row() for budget in self.budgets.values())
+
+    def update_budget(self, category, budget, period, rollover, started=None):
+        started = (started or datetime.date.today()).isoformat()
+        budgets = self.matching_budgets(category)
+        for existing in budgets:
+            existing.change(budget, period, rollover, started)
+        return bool(budgets)
+
+    def delete_budget(self, category):
+        budgets = self.matching_budgets(category)
+        for existing in budgets:
+            del self.budgets[existing.category]
+        return bool(budgets)
+
+    def set_goal(self, goal, amount, date):
+        for existing in self.goals.values():
+            if existing.goal == goal:
+                existing.amount, existing.date = amount, date
+                return
+        self.goals[self.next_goal_id] = GoalRecord(self.next_goal_id, goal, amount, date)
+        self.next_goal_id += 1
+
+    def get_goal(self, goal_id):
+        goal = self.goals.get(parse_record_id(goal_id))
+        return None if goal is None else goal.row()
+
+    def list_goals(self):
+        return [goal.row() for goal in self.goals.values()]
+
+    def update_goal(self, goal_id, goal=None, amount=None, date=None):
+        existing = self.goals.get(parse_record_id(goal_id))
+        if existing is None:
+            return False
+        if goal is not None and goal != existing.goal and any(other.goal == goal for other in self.goals.values()):
+            raise StorageError('UNIQUE constraint failed: goals.goal')
+        if goal is not None:
+            existing.goal = goal
+        if amount is not None:
+            existing.amount = amount
+        if date is not None:
+            existing.date = date
+        return True
+
+    def delete_goal(self, goal_id):
+        return self.goals.pop(parse_record_id(goal_id), None) is not None
+
+    def total_goals(self):
+        return sum(goal.amount for goal in self.goals.values())
+
+    # Looks up the category and amount in a hash index, then checks the dates.
+    def find_similar_records(self, kind, category, amount, date, window_days):
+        check_record_field(kind)
+        records = self.records[kind]
+        first, last = date_window(date, window_days)
+        return [records.row(position) for position in sorted(records.by_amount.get((category, amount), ()))
+                if first <= str(records.dates[position]) <= last]
+
+    def category_stats(self, kind, category):
+        check_record_field(kind)
+        return tuple(self.records[kind].stats.get(category, (0, 0.0, 0.0)))
+
+
+# The storage the menu options read and write. main() opens the database file
+# if nothing else has been set, so other programs can use MemoryStorage() instead.
+storage = None
 
 
 # Main function to display menu and execute user's choice.
 def main():
+    global storage
     create_database_and_tables()
-    populate_initial_values()
+    opened_storage = storage is None
+    if opened_storage:
+        try:
+            storage = SQLiteStorage('expense_budget_app.db')
+        except StorageError as error:
+            print('Error:', error)
+            return
 
     while True:
         print('\nMenu:')
@@ -92,6 +903,14 @@ def main():
         print('17. View progress towards financial goals. *')
         print('18. Update financial goals.')
         print('19. Delete financial goals.')
+        print('\n20. Back up the database.')
+        print('21. Compact the database.')
+        print('22. Check the database for errors.')
+        print('\n23. Sync with another copy of the database.')
+        print('24. Export changes to a sync file.')
+        print('25. Apply changes from a sync file.')
+        print('\n26. Browse expenses and income (full screen).')
+        print('27. Scan for duplicate and unusual records.')
         print('\n0. Exit')
 
         choice = input('\nPlease enter your choice: ')
@@ -135,15 +954,123 @@ def main():
                 update_financial_goals()
             elif choice == 19:
                 delete_financial_goal()
+            elif choice == 20:
+                backup_database()
+            elif choice == 21:
+                compact_database()
+            elif choice == 22:
+                check_database_integrity()
+            elif choice == 23:
+                sync_with_database()
+            elif choice == 24:
+                export_sync_changes()
+            elif choice == 25:
+                apply_sync_changes()
+            elif choice == 26:
+                browse_records()
+            elif choice == 27:
+                scan_for_anomalies()
             elif choice == 0:
                 print('\nThank you for using the expense and budget tracker app. Have a great day!\n')
+                if opened_storage:
+                    storage.close()
+                    storage = None
                 break
             else:
                 print(f"\nInvalid choice '{choice}'. Please enter a valid number.")
-                print('(Options 1 - 19 or 0 to exit.)')
+                print('(Options 1 - 27 or 0 to exit.)')
         else:
             print(f"\nInvalid input '{choice}'. Please enter a valid number.")
-            print('(Options 1 - 19 or 0 to exit.)')
+            print('(Options 1 - 27 or 0 to exit.)')
+
+
+# Expenses or income with the same category and amount, dated this many days
+# apart or closer, are flagged as possible duplicates.
+DUPLICATE_WINDOW_DAYS = 3
+# Amounts this many standard deviations above their category's average are
+# flagged as unusual, once the category has at least OUTLIER_MIN_COUNT other records.
+OUTLIER_STANDARD_DEVIATIONS = 3.0
+OUTLIER_MIN_COUNT = 5
+# The standard deviation is taken to be at least this fraction of the average,
+# so a category whose amounts have always been the same can still have an unusual one.
+OUTLIER_MIN_SPREAD = 0.1
+
+
+# Function to work out how many standard deviations above the average an amount
+# is, from running statistics. Returns None if there are too few records to tell.
+def outlier_score(stats, amount):
+    count, mean, m2 = stats
+    if count < OUTLIER_MIN_COUNT:
+        return None
+    spread = max(math.sqrt(m2 / (count - 1)), abs(mean) * OUTLIER_MIN_SPREAD)
+    if spread <= 0:
+        return None
+    return (amount - mean) / spread
+
+
+# Function to check a new expense or income before it is added. Likely
+# duplicates are shown and the user is asked whether to add it anyway, and an
+# unusually high amount is pointed out. Returns True if it should be added.
+def confirm_new_record(kind, category, amount, date):
+    duplicates = storage.find_similar_records(kind, category, amount, date, DUPLICATE_WINDOW_DAYS)
+    if duplicates:
+        print(f'\nThis looks like a duplicate of {len(duplicates)} {kind} record(s) already added:')
+        for record in duplicates:
+            print('ID {:<8} | {:<22} | {:<12} | {}'.format(*record))
+        while True:
+            confirmation = input(f'\nDo you still want to add this {kind}?\n\n1. Add it anyway.\n2. Disregard and go back to the main menu.\n\nEnter your choice: ')
+            if confirmation == '1':
+                break
+            elif confirmation == '2':
+                print(f'\n{kind.capitalize()} not added. Returning to the main menu.')
+                return False
+            else:
+                print("\nInvalid choice. Please enter either '1' or '2'.")
+
+    stats = storage.category_stats(kind, category)
+    score = outlier_score(stats, amount)
+    if score is not None and score >= OUTLIER_STANDARD_DEVIATIONS:
+        print(f"\nNote: {amount} is unusually high for '{category}' "
+              f'(the average is {stats[1]:.2f}, and this is {score:.1f} standard deviations above it).')
+    return True
+
+
+# Function to find likely duplicates and unusual amounts among a list of records,
+# in time proportional to the number of records. A first pass works out each
+# category's statistics, and each record is then scored against them with that
+# record taken out, the same way a new record is scored before it is added. The
+# second keeps a hash index of the latest record seen
+# for each category, amount and day, and links each record only to the latest
+# earlier one within the window. A run of copies of the same record is then
+# reported as a chain of pairs, one for each copy, rather than every pair of them.
+def scan_records(records, window_days=DUPLICATE_WINDOW_DAYS):
+    stats = {}
+    for record in records:
+        add_to_stats(stats.setdefault(record[1], [0, 0.0, 0.0]), record[2])
+    outliers = []
+    for record in records:
+        others = list(stats[record[1]])
+        remove_from_stats(others, record[2])
+        score = outlier_score(others, record[2])
+        if score is not None and score >= OUTLIER_STANDARD_DEVIATIONS:
+            outliers.append((record, score))
+
+    duplicates = []
+    latest = {}
+    for position, record in enumerate(records):
+        try:
+            day = datetime.date.fromisoformat(record[3]).toordinal()
+            nearby_days = range(day - window_days, day + window_days + 1)
+        except (TypeError, ValueError):
+            # Dates not in YYYY-MM-DD form only match the exact same text.
+            day = record[3]
+            nearby_days = (day,)
+        matches = [latest[key] for key in ((record[1], record[2], nearby_day) for nearby_day in nearby_days)
+                   if key in latest]
+        if matches:
+            duplicates.append((max(matches)[1], record))
+        latest[(record[1], record[2], day)] = (position, record)
+    return duplicates, outliers
 
 
 # 1 Function to add a new expense to the database.
@@ -159,25 +1086,18 @@ def add_expense():
                 print('\nInvalid input. Please enter a valid number.')
         date = input('Enter expense date (YYYY-MM-DD): ')
 
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        cursor.execute('''INSERT INTO expense (category, amount, date)
-                        VALUES (?, ?, ?)''', (category, amount_float, date))
-        db.commit()
+        if not confirm_new_record('expense', category, amount_float, date):
+            return
+        storage.add_record('expense', category, amount_float, date)
         print(f"\nExpense added successfully '{category} - {amount_float}'!")
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 2 Function to view expenses in the database.
 def view_expenses():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        cursor.execute('''SELECT * FROM expense''')
-        expenses = cursor.fetchall()
+        expenses = storage.list_records('expense')
         if not expenses:
             print('\nNo expenses found.')
         else:
@@ -185,20 +1105,15 @@ def view_expenses():
             print('----------------------------------------------------------------')
             for expense in expenses:
                 print('{:<11} | {:<22} | {:<12} | {}'.format(expense[0], expense[1], expense[2], expense[3]))
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 3 Function to view expense by category in the database.
 def view_expense_by_category():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         category = input('\nEnter the category to view expenses for: ').lower() 
-        cursor.execute('''SELECT * FROM expense WHERE LOWER(category) = ?''', (category,))
-        expenses = cursor.fetchall()
+        expenses = storage.list_records('expense', category)
         if not expenses:
             print(f'\nNo expenses found for the category: ({category.capitalize()})')
         else:
@@ -206,20 +1121,15 @@ def view_expense_by_category():
             print('----------------------------------------------------------------')
             for expense in expenses:
                 print('{:<11} | {:<22} | {:<12} | {}'.format(expense[0], expense[1], expense[2], expense[3]))
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 4 Function to update expenses, category, or date in the database.
 def update_expenses():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         expense_id = input('\nEnter the expense ID to update: ')
-        cursor.execute('''SELECT * FROM expense WHERE id = ?''', (expense_id,))
-        expense = cursor.fetchone()
+        expense = storage.get_record('expense', expense_id)
         if not expense:
             print("\nExpense with ID '{}' not found.".format(expense_id))
             return
@@ -260,14 +1170,11 @@ def update_expenses():
             print(f'\nInvalid option ({option}). Please enter either 1, 2, 3 or 4.')
             return
         
-        cursor.execute('''UPDATE expense SET {} = ? WHERE id = ?'''.format(field), (new_value, expense_id))
-        db.commit()
+        storage.update_record('expense', expense_id, field, new_value)
         print(f"\nExpense updated successfully '{field} - {new_value}'!")
         
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 5 Function to delete expense.
@@ -278,10 +1185,11 @@ def delete_expense():
         print('\nInvalid input. Please enter a valid expense ID (a number ID).')
         print('(You can search for an expense number ID at the \'view expense\' option).')
         return
-    db = sqlite3.connect('expense_budget_app.db')
-    cursor = db.cursor()
-    cursor.execute('SELECT * FROM expense WHERE id=?', (expense_id,))
-    expense = cursor.fetchone()
+    try:
+        expense = storage.get_record('expense', expense_id)
+    except StorageError as error:
+        print('Error:', error)
+        return
     if expense is None:
         print(f'\nExpense with ID ({expense_id}) has not been found.')
         print('(You can search for available expense number ID at the \'view expense\' option).')
@@ -297,8 +1205,11 @@ def delete_expense():
             if confirmation == '1':
                 # To have the expense saved to show the user once expense deleted.
                 category = expense[1]
-                cursor.execute('DELETE FROM expense WHERE id=?', (expense_id,))
-                db.commit()
+                try:
+                    storage.delete_record('expense', expense_id)
+                except StorageError as error:
+                    print('Error:', error)
+                    break
                 print(f'\nExpense (ID: {expense_id}) - \'{category}\' has been deleted successfully.')
                 break
             elif confirmation == '2':
@@ -306,7 +1217,6 @@ def delete_expense():
                 break
             else:
                 print("\nInvalid choice. Please enter either '1' or '2'.")
-    db.close()
 
 
 # 6 Function to add income in the database.
@@ -321,25 +1231,18 @@ def add_income():
             except ValueError:
                 print('\nInvalid input. Please enter a valid number.')
         date = input('Enter income date (YYYY-MM-DD): ')
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        cursor.execute('''INSERT INTO income (category, amount, date)
-                        VALUES (?, ?, ?)''', (category, amount_float, date))
-        db.commit()
+        if not confirm_new_record('income', category, amount_float, date):
+            return
+        storage.add_record('income', category, amount_float, date)
         print(f"\nIncome added successfully '{category} - {amount_float}'!")
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 7 Function to view income in the database.
 def view_income():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        cursor.execute('''SELECT * FROM income''')
-        income = cursor.fetchall()
+        income = storage.list_records('income')
         if not income:
             print('\nNo income found.')
         else:
@@ -347,20 +1250,15 @@ def view_income():
             print('----------------------------------------------------------------')
             for incomes in income:
                 print('{:<11} | {:<22} | {:<12} | {}'.format(incomes[0], incomes[1], incomes[2], incomes[3]))
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 8 Function to view income by category in the database.
 def view_income_by_category():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         category = input('\nEnter the category to view income for: ').lower()
-        cursor.execute('''SELECT * FROM income WHERE LOWER(category) = ?''', (category,))
-        income = cursor.fetchall()
+        income = storage.list_records('income', category)
         if not income:
             print(f'\nNo income found for the category: ({category.capitalize()})')
         else:
@@ -368,20 +1266,15 @@ def view_income_by_category():
             print('----------------------------------------------------------------')
             for incomes in income:
                 print('{:<11} | {:<22} | {:<12} | {}'.format(incomes[0], incomes[1], incomes[2], incomes[3]))
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 9 Function to update income, category, or date in the database.
 def update_income():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         income_id = input('\nEnter the income ID to update: ')
-        cursor.execute('''SELECT * FROM income WHERE id = ?''', (income_id,))
-        income = cursor.fetchone()
+        income = storage.get_record('income', income_id)
         if not income:
             print("\nIncome with ID '{}' not found.".format(income_id))
             return
@@ -421,14 +1314,11 @@ def update_income():
             print(f'\nInvalid option ({option}). Please enter either 1, 2, 3 or 4.')
             return
         
-        cursor.execute('''UPDATE income SET {} = ? WHERE id = ?'''.format(field), (new_value, income_id))
-        db.commit()
+        storage.update_record('income', income_id, field, new_value)
         print(f"\nIncome updated successfully '{field} - {new_value}'!")
         
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 10 Function to delete income.
@@ -439,10 +1329,11 @@ def delete_income():
         print('\nInvalid input. Please enter a valid income ID (a number ID).')
         print('(You can search for an income number ID at the \'view income\' option).')
         return
-    db = sqlite3.connect('expense_budget_app.db')
-    cursor = db.cursor()
-    cursor.execute('SELECT * FROM income WHERE id=?', (income_id,))
-    income = cursor.fetchone()
+    try:
+        income = storage.get_record('income', income_id)
+    except StorageError as error:
+        print('Error:', error)
+        return
     if income is None:
         print(f'\nIncome with ID ({income_id}) has not been found.')
         print('(You can search for available income number ID at the \'view income\' option).')
@@ -458,8 +1349,11 @@ def delete_income():
             if confirmation == '1':
                 # To have the income saved to show the user once income deleted.
                 category = income[1]
-                cursor.execute('DELETE FROM income WHERE id=?', (income_id,))
-                db.commit()
+                try:
+                    storage.delete_record('income', income_id)
+                except StorageError as error:
+                    print('Error:', error)
+                    break
                 print(f'\nIncome (ID: {income_id}) - \'{category}\' has been deleted successfully.')
                 break
             elif confirmation == '2':
@@ -467,28 +1361,14 @@ def delete_income():
                 break
             else:
                 print("\nInvalid choice. Please enter either '1' or '2'.")
-    db.close()
 
 
 # 11 Function to view total amount of expenses, income, and total needed for financial goals.
 def total_amount():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        cursor.execute('''SELECT SUM(amount) FROM expense''')
-        total_expense = cursor.fetchone()[0]
-        if total_expense is None:
-            total_expense = 0
-
-        cursor.execute('''SELECT SUM(amount) FROM income''')
-        total_income = cursor.fetchone()[0]
-        if total_income is None:
-            total_income = 0
-
-        cursor.execute('''SELECT SUM(amount) FROM goals''')
-        total_goals = cursor.fetchone()[0]
-        if total_goals is None:
-            total_goals = 0
+        total_expense = storage.total('expense')
+        total_income = storage.total('income')
+        total_goals = storage.total_goals()
 
         net_total = total_income - total_expense
         total_needed_for_goals = total_goals - net_total
@@ -500,76 +1380,115 @@ def total_amount():
         print('Total Needed for Goals: {:.2f}'.format(total_needed_for_goals))
         print('-------------------------------------')
 
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
 
 
+# Periods a budget can be set for.
+BUDGET_PERIODS = ('weekly', 'monthly', 'yearly')
+
+
+# Function to work out the first day of the budget period a date falls in, and
+# the first day of the period after it. Weeks start on Monday.
+def budget_period_bounds(period, day):
+    if period == 'weekly':
+        start = day - datetime.timedelta(days=day.weekday())
+        end = start + datetime.timedelta(days=7)
+    elif period == 'yearly':
+        start = day.replace(month=1, day=1)
+        end = start.replace(year=start.year + 1)
+    else:
+        start = day.replace(day=1)
+        end = (start + datetime.timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+# Function to ask for a budget period, with a default if Enter is pressed.
+def input_budget_period(prompt, default):
+    while True:
+        period = input(prompt).strip().lower() or default
+        if period in BUDGET_PERIODS:
+            return period
+        print('\nInvalid period. Please enter weekly, monthly or yearly.')
+
+
+# Function to ask whether unspent budget should carry over, with a default if Enter is pressed.
+def input_budget_rollover(prompt, default):
+    while True:
+        answer = input(prompt).strip().lower()
+        if not answer:
+            return default
+        if answer in ('y', 'yes'):
+            return 1
+        if answer in ('n', 'no'):
+            return 0
+        print("\nInvalid choice. Please enter either 'y' or 'n'.")
+
+
 # 12 Function to set budget for a category.
 def set_budget_for_a_category():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         category = input('\nEnter the category to set budget for: ').lower()
+        period = input_budget_period('Enter the budget period - weekly, monthly or yearly (or press Enter for monthly): ', 'monthly')
         while True:
             try:
-                budget = float(input('Enter the budget for this category: '))
+                budget = float(input(f'Enter the {period} budget for this category: '))
                 if budget < 0:
                     print('Budget cannot be negative. Please enter a valid amount.')
                 else:
                     break
             except ValueError:
                 print('\nInvalid input. Please enter a valid number.')
+        rollover = input_budget_rollover('Carry any unspent budget over to the next period? (y/n): ', 0)
 
-        cursor.execute('''INSERT OR REPLACE INTO budgets (category, budget)
-                        VALUES (?, ?)''', (category, budget))
-        db.commit()
-        print(f"\nBudget set successfully for '{category.capitalize()} - {budget}'!")
+        storage.set_budget(category, budget, period, rollover)
+        print(f"\nBudget set successfully for '{category.capitalize()} - {budget} {period}'!")
 
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
-# 13 Function to view budget for all categories along with total expenses for each category.
+# 13 Function to view budget for all categories along with expenses for the current period.
+# With rollover, whatever was left unspent in the previous period is added to this one,
+# as long as the budget had already taken effect in that period.
 def view_budget_for_all_categories():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        cursor.execute('''SELECT b.category, b.budget, COALESCE(SUM(e.amount), 0) AS total_expense
-                        FROM budgets AS b
-                        LEFT JOIN expense AS e ON b.category = e.category
-                        GROUP BY b.category''')
-        budgets = cursor.fetchall()
+        budgets = storage.list_budgets()
         if not budgets:
             print('\nNo budgets set.')
         else:
-            print('\nCategory           | Budget       | Total Expense')
-            print('---------------------------------------------------')
+            today = datetime.date.today()
+            print('\nCategory           | Period   | From       | Budget       | Available    | Spent        | Remaining')
+            print('------------------------------------------------------------------------------------------------------')
             for budget in budgets:
                 category = budget[0]
                 budget_amount = budget[1]
-                total_expense = budget[2]
-                print('{:<18} | {:<12.2f} | {:.2f}'.format(category, budget_amount, total_expense))
-    except sqlite3.Error as error:
+                period = budget[2]
+                start, end = budget_period_bounds(period, today)
+                total_expense = storage.total_in_period('expense', category, start, end)
+                available = budget_amount
+                previous_start, previous_end = budget_period_bounds(period, start - datetime.timedelta(days=1))
+                # Without a start date, nothing is known to have been left over.
+                started = datetime.date.fromisoformat(budget[4]) if budget[4] else start
+                if budget[3] and budget_period_bounds(period, started)[0] <= previous_start:
+                    available += max(0, budget_amount - storage.total_in_period('expense', category, previous_start, previous_end))
+                print('{:<18} | {:<8} | {} | {:<12.2f} | {:<12.2f} | {:<12.2f} | {:.2f}'.format(
+                    category, period, start.isoformat(), budget_amount, available, total_expense, available - total_expense))
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 14 Function to update a budget.
 def update_budget():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         category = input('\nEnter the category for which you want to update the budget: ').lower()
-        cursor.execute('''SELECT * FROM budgets WHERE LOWER(category) = ?''', (category,))
-        existing_budget = cursor.fetchone()
+        existing_budget = storage.get_budget(category)
         if not existing_budget:
             print(f'\nNo budget found for category "{category.capitalize()}".')
             return
         else:
-            print(f'\nExisting Budget for Category "{category.capitalize()}": {existing_budget[1]}')
+            rollover_text = 'with rollover' if existing_budget[3] else 'no rollover'
+            print(f'\nExisting Budget for Category "{category.capitalize()}": {existing_budget[1]} {existing_budget[2]} ({rollover_text})')
             while True:
                 try:
                     new_budget = float(input('Enter the new budget: '))
@@ -579,48 +1498,39 @@ def update_budget():
                         break
                 except ValueError:
                     print('\nInvalid input. Please enter a valid number.')
-            
-            cursor.execute('''UPDATE budgets SET budget = ? WHERE LOWER(category) = ?''', (new_budget, category))
-            db.commit()
-            print(f"\nBudget for category '{category.capitalize()} - {new_budget}' updated successfully!")
-    except sqlite3.Error as error:
+            new_period = input_budget_period('Enter the new period - weekly, monthly or yearly (or press Enter to keep the current period): ', existing_budget[2])
+            new_rollover = input_budget_rollover('Carry any unspent budget over to the next period? (y/n) (or press Enter to keep the current setting): ', existing_budget[3])
+
+            storage.update_budget(category, new_budget, new_period, new_rollover)
+            print(f"\nBudget for category '{category.capitalize()} - {new_budget} {new_period}' updated successfully!")
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 15 Function to delete a budget.
 def delete_budget():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         category = input('\nEnter the category for which you want to delete the budget: ').lower()
-        cursor.execute('''SELECT * FROM budgets WHERE LOWER(category) = ?''', (category,))
-        existing_budget = cursor.fetchone()
+        existing_budget = storage.get_budget(category)
         if not existing_budget:
             print(f'\nNo budget found for category "{category.capitalize()}".')
             return
         else:
             confirmation = input(f'\nAre you sure you wish to delete the budget for category "{category.capitalize()}"?\n\n1. Continue with the deletion.\n2. Disregard and go back to the main menu.\n\nEnter your choice: ')
             if confirmation == '1':
-                cursor.execute('''DELETE FROM budgets WHERE LOWER(category) = ?''', (category,))
-                db.commit()
+                storage.delete_budget(category)
                 print(f'\nBudget for category "{category.capitalize()}" deleted successfully!')
             elif confirmation == '2':
                 print('\nDeletion canceled. Returning to the main menu.')
             else:
                 print("\nInvalid choice. Please enter either '1' or '2'.")
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 16 Function to set financial goals.
 def set_financial_goals():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         goal_title = input('\nEnter a title for your financial goal: ').lower()
         while True:
             try:
@@ -632,36 +1542,19 @@ def set_financial_goals():
             except ValueError:
                 print('\nInvalid input. Please enter a valid number.')
         goal_date = input('Enter the date by which you want to achieve this goal (YYYY-MM-DD): ')
-        cursor.execute('''INSERT OR REPLACE INTO goals (goal, amount, date)
-                        VALUES (?, ?, ?)''', (goal_title, goal_amount, goal_date))
-        db.commit()
+        storage.set_goal(goal_title, goal_amount, goal_date)
         print(f"\nFinancial goal set successfully for '{goal_title.capitalize()} - {goal_amount}'!")
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 17 Function to view financial goals along with net total, amount needed to reach goal, and goal date.
 def view_financial_goals_with_net_total():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-
-        cursor.execute('''SELECT * FROM goals''')
-        goals = cursor.fetchall()
 
-        total_income = 0
-        cursor.execute('''SELECT SUM(amount) FROM income''')
-        total_income_result = cursor.fetchone()
-        if total_income_result:
-            total_income = total_income_result[0] or 0
-
-        total_expense = 0
-        cursor.execute('''SELECT SUM(amount) FROM expense''')
-        total_expense_result = cursor.fetchone()
-        if total_expense_result:
-            total_expense = total_expense_result[0] or 0
+        goals = storage.list_goals()
+        total_income = storage.total('income')
+        total_expense = storage.total('expense')
 
         net_total = total_income - total_expense
 
@@ -682,21 +1575,15 @@ def view_financial_goals_with_net_total():
                 print('| {:<8} | {:<30} | {:>12.2f} | {:>20} | {:>12.2f} | {:>12.2f} |'.format(goal_id, goal_name, goal_amount, goal_date, net_total, difference))
             print('|---------------------------------------------------------------------------------------------------------------|')
 
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 18 Function to update financial goals.
 def update_financial_goals():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        
         goal_id = input('\nEnter the ID of the financial goal you want to edit: ')
-        cursor.execute('''SELECT * FROM goals WHERE id = ?''', (goal_id,))
-        goal = cursor.fetchone()
+        goal = storage.get_goal(goal_id)
         if not goal:
             print(f'\nFinancial goal with ID ({goal_id}) not found.')
             return
@@ -711,35 +1598,27 @@ def update_financial_goals():
         new_goal_amount = input('Enter a new amount for the financial goal (or press Enter to keep the current amount): ')
         new_goal_date = input('Enter a new date for the financial goal (YYYY-MM-DD) (or press Enter to keep the current date): ')
 
-        if new_goal_title:
-            cursor.execute('''UPDATE goals SET goal = ? WHERE id = ?''', (new_goal_title, goal_id))
+        amount = None
         if new_goal_amount:
             try:
-                new_goal_amount = float(new_goal_amount)
-                cursor.execute('''UPDATE goals SET amount = ? WHERE id = ?''', (new_goal_amount, goal_id))
+                amount = float(new_goal_amount)
+                new_goal_amount = amount
             except ValueError:
                 print('Invalid input for amount. Please enter a valid number.')
-        if new_goal_date:
-            cursor.execute('''UPDATE goals SET date = ? WHERE id = ?''', (new_goal_date, goal_id))
 
-        db.commit()
+        storage.update_goal(goal_id, new_goal_title or None, amount, new_goal_date or None)
         print(f"\nFinancial goal updated successfully '{goal_id} - {new_goal_title} - {new_goal_amount} - {new_goal_date}'!")
 
-    except sqlite3.Error as error:
+    except StorageError as error:
         print('Error:', error)
-    finally:
-        db.close()
 
 
 # 19 Function to delete a financial goal.
 def delete_financial_goal():
     try:
-        db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
         goal_id = int(input('\nEnter the goal ID you want to delete: '))
         
-        cursor.execute('''SELECT * FROM goals WHERE id = ?''', (goal_id,))
-        goal = cursor.fetchone()
+        goal = storage.get_goal(goal_id)
         if goal is None:
             print(f'\nFinancial goal with ID ({goal_id}) not found.')
             return
@@ -749,8 +1628,7 @@ def delete_financial_goal():
 
             confirmation = input(f"\nAre you sure you wish to delete the financial goal with ID '{goal_id}' ({goal_name})?\n\n1. Continue with the deletion.\n2. Disregard and go back to the main menu.\n\nEnter your choice: ")
             if confirmation == '1':
-                cursor.execute('DELETE FROM goals WHERE id=?', (goal_id,))
-                db.commit()
+                storage.delete_goal(goal_id)
                 print(f'\nFinancial goal (ID: {goal_id}) - "{goal_name}" with amount {goal_amount} has been deleted successfully.')
             elif confirmation == '2':
                 print('\nDeletion canceled. Returning to the main menu.')
@@ -758,54 +1636,764 @@ def delete_financial_goal():
                 print("\nInvalid choice. Please enter either '1' or '2'.")
     except ValueError:
         print('\nInvalid input. Please enter a valid goal ID (a number ID).')
+    except StorageError as error:
+        print('Error:', error)
+
+
+# Number of database pages copied or freed in each step of a backup or compaction.
+# Other users of the database can read and write between steps.
+MAINTENANCE_PAGES_PER_STEP = 1024
+
+
+# Function to work out how many megabytes per second a maintenance task ran at.
+def megabytes_per_second(pages, page_size, seconds):
+    megabytes = pages * page_size / (1024 * 1024)
+    return megabytes, megabytes / seconds if seconds > 0 else megabytes
+
+
+# 20 Function to back up the database while it is in use.
+def backup_database():
+    default_name = time.strftime('expense_budget_app_backup_%Y%m%d_%H%M%S.db')
+    backup_name = input(f"\nEnter a file name for the backup (or press Enter for '{default_name}'): ") or default_name
+    if os.path.abspath(backup_name) == os.path.abspath('expense_budget_app.db'):
+        print('\nThe backup cannot be saved over the database itself. Please choose another file name.')
+        return
+    if os.path.exists(backup_name):
+        confirmation = input(f"\nThe file '{backup_name}' already exists. Do you want to replace it?\n\n1. Replace the file.\n2. Disregard and go back to the main menu.\n\nEnter your choice: ")
+        if confirmation != '1':
+            print('\nBackup canceled. Returning to the main menu.')
+            return
+
+    db = backup = None
+    try:
+        db = sqlite3.connect('expense_budget_app.db')
+        backup = sqlite3.connect(backup_name)
+        page_size = db.execute('PRAGMA page_size').fetchone()[0]
+        reported = [0]
+
+        # Only print every 10% so large databases do not flood the screen.
+        def report_progress(status, remaining, total):
+            percent = (total - remaining) * 100 // total if total else 100
+            if percent >= reported[0] + 10 or remaining == 0:
+                reported[0] = percent
+                print(f'  Copied {total - remaining} of {total} pages ({percent}%).')
+
+        print(f"\nBacking up the database to '{backup_name}'...")
+        start_time = time.perf_counter()
+        # Copying in steps with a short pause in between lets the app and other
+        # users keep reading and writing while the backup runs.
+        db.backup(backup, pages=MAINTENANCE_PAGES_PER_STEP, progress=report_progress, sleep=0.01)
+        elapsed = time.perf_counter() - start_time
+        pages = backup.execute('PRAGMA page_count').fetchone()[0]
+        megabytes, rate = megabytes_per_second(pages, page_size, elapsed)
+        print(f'\nBackup completed successfully! {megabytes:.2f} MB in {elapsed:.2f} seconds ({rate:.2f} MB/s).')
     except sqlite3.Error as error:
         print('Error:', error)
     finally:
-        db.close()
+        if backup is not None:
+            backup.close()
+        if db is not None:
+            db.close()
 
 
-# Program Start.
-print('\n- Welcome to the Expense and Budget Tracker App!')
-print('- When using the app, assume the currency of your choice.')
-print("- Stars '*' represent quick views for total incomes, expenses, goals, etc.")
-main()
+# 21 Function to reclaim the free space left behind by deleted records.
+def compact_database():
+    db = None
+    try:
+        db = sqlite3.connect('expense_budget_app.db', isolation_level=None)
+        page_size = db.execute('PRAGMA page_size').fetchone()[0]
+        auto_vacuum = db.execute('PRAGMA auto_vacuum').fetchone()[0]
+
+        # Databases made before incremental compaction was switched on need one
+        # full compaction first, which blocks other users until it finishes.
+        if auto_vacuum != 2:
+            confirmation = input('\nThis database needs a one-off full compaction before it can be compacted in the background.\nOther users of the database will have to wait until it finishes.\n\n1. Continue with the compaction.\n2. Disregard and go back to the main menu.\n\nEnter your choice: ')
+            if confirmation != '1':
+                print('\nCompaction canceled. Returning to the main menu.')
+                return
+            pages_before = db.execute('PRAGMA page_count').fetchone()[0]
+            start_time = time.perf_counter()
+            db.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            db.execute('VACUUM')
+            elapsed = time.perf_counter() - start_time
+            freed_pages = pages_before - db.execute('PRAGMA page_count').fetchone()[0]
+            megabytes, rate = megabytes_per_second(pages_before, page_size, elapsed)
+            print(f'\nDatabase compacted successfully! {freed_pages} pages freed, {megabytes:.2f} MB rewritten in {elapsed:.2f} seconds ({rate:.2f} MB/s).')
+            return
+
+        free_pages = db.execute('PRAGMA freelist_count').fetchone()[0]
+        if free_pages == 0:
+            print('\nThere is no free space to reclaim.')
+            return
+
+        print(f'\nReclaiming {free_pages} free pages...')
+        start_time = time.perf_counter()
+        remaining = free_pages
+        while remaining > 0:
+            # Each step runs in its own short transaction so other users are only
+            # blocked for a moment at a time.
+            db.executescript(f'PRAGMA incremental_vacuum({MAINTENANCE_PAGES_PER_STEP})')
+            still_free = db.execute('PRAGMA freelist_count').fetchone()[0]
+            if still_free >= remaining:
+                break
+            remaining = still_free
+            time.sleep(0.01)
+        freed_pages = free_pages - remaining
+        elapsed = time.perf_counter() - start_time
+        megabytes, rate = megabytes_per_second(freed_pages, page_size, elapsed)
+        print(f'\nDatabase compacted successfully! {freed_pages} pages ({megabytes:.2f} MB) freed in {elapsed:.2f} seconds ({rate:.2f} MB/s).')
+    except sqlite3.Error as error:
+        print('Error:', error)
+    finally:
+        if db is not None:
+            db.close()
 
 
-# 19 Function to delete a financial goal.
-def delete_financial_goal():
+# 22 Function to check the database for corruption.
+def check_database_integrity():
+    db = None
     try:
         db = sqlite3.connect('expense_budget_app.db')
-        cursor = db.cursor()
-        goal_id = int(input('\nEnter the goal ID you want to delete: '))
-        
-        cursor.execute('''SELECT * FROM goals WHERE id = ?''', (goal_id,))
-        goal = cursor.fetchone()
-        if goal is None:
-            print(f'\nFinancial goal with ID ({goal_id}) not found.')
-            return
+        page_size = db.execute('PRAGMA page_size').fetchone()[0]
+        pages = db.execute('PRAGMA page_count').fetchone()[0]
+        print('\nChecking the database...')
+        start_time = time.perf_counter()
+        # The check only reads, so other users can keep working while it runs.
+        problems = [row[0] for row in db.execute('PRAGMA integrity_check')]
+        elapsed = time.perf_counter() - start_time
+        megabytes, rate = megabytes_per_second(pages, page_size, elapsed)
+        if problems == ['ok']:
+            print(f'\nNo problems found. {megabytes:.2f} MB checked in {elapsed:.2f} seconds ({rate:.2f} MB/s).')
         else:
-            goal_name = goal[1]
-            goal_amount = goal[2]
+            print(f'\n{len(problems)} problem(s) found:')
+            for problem in problems:
+                print(' -', problem)
+            print('(You can restore a backup made with the \'back up the database\' option).')
+    except sqlite3.Error as error:
+        print('Error:', error)
+    finally:
+        if db is not None:
+            db.close()
+
+
+# Tables that are copied between devices when syncing, and the columns that hold
+# the user's data. Budgets and goals are also matched on their category or title,
+# since those have to be unique.
+SYNCED_TABLES = {
+    'expense': ('category', 'amount', 'date'),
+    'income': ('category', 'amount', 'date'),
+    'budgets': ('category', 'budget', 'period', 'rollover', 'started'),
+    'goals': ('goal', 'amount', 'date'),
+}
+SYNC_UNIQUE_COLUMNS = {'budgets': 'category', 'goals': 'goal'}
+
+
+# Function to collect the changes made in a database after a given change number.
+# Records last changed by the device the changes are for (if one is given) are
+# left out, since it already has them. Each record carries its logical clock and the device that last
+# changed it, which is what conflicts are decided on.
+def export_changes(db, since_seq=0, for_device=None):
+    device, last_seq = db.execute('SELECT device, seq FROM sync_state').fetchone()
+    changes = {'device': device, 'seq': last_seq, 'tables': {}, 'tombstones': [],
+               'received': dict(db.execute('SELECT device, received_seq FROM sync_peers').fetchall())}
+    for table, columns in SYNCED_TABLES.items():
+        sync_columns = ('row_uuid', 'clock', 'device') + columns
+        rows = db.execute(f'''SELECT {', '.join(sync_columns)} FROM {table}
+                            WHERE seq > ? AND seq <= ? AND device IS NOT ?''',
+                          (since_seq, last_seq, for_device)).fetchall()
+        if rows:
+            changes['tables'][table] = {'columns': sync_columns, 'rows': rows}
+    # Deletions are all sent, since one made here to settle a clash between two
+    # budgets or goals carries the device ID of the record that stayed.
+    changes['tombstones'] = db.execute('''SELECT table_name, row_uuid, clock, device FROM tombstones
+                                        WHERE seq > ? AND seq <= ?''', (since_seq, last_seq)).fetchall()
+    return changes
+
+
+# Function to turn a set of changes into compact bytes to save or send.
+def encode_changes(changes):
+    return zlib.compress(json.dumps(changes, separators=(',', ':')).encode('utf-8'))
+
+
+# Function to read a set of changes back from bytes.
+def decode_changes(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+# Function to record that a synced record was deleted, unless a newer deletion is already recorded.
+def record_tombstone(cursor, table, row_uuid, clock, device, seq):
+    tombstone = cursor.execute('''SELECT clock, device FROM tombstones
+                                WHERE table_name = ? AND row_uuid = ?''', (table, row_uuid)).fetchone()
+    if tombstone and tuple(tombstone) >= (clock, device):
+        return
+    cursor.execute('''INSERT OR REPLACE INTO tombstones (table_name, row_uuid, clock, device, seq)
+                    VALUES (?, ?, ?, ?, ?)''', (table, row_uuid, clock, device, seq))
+
+
+# Function to apply a set of changes from another device and return how many
+# records were changed. When both devices changed the same record, the change
+# with the higher logical clock wins, and ties are broken on the device ID, so
+# every device ends up with the same result whatever order it syncs in.
+# Budgets and goals must also keep their category or title unique. When two
+# different records end up with the same one, the same rule picks the record
+# that stays, and the other is deleted everywhere with a tombstone.
+def apply_changes(db, changes):
+    cursor = db.cursor()
+    try:
+        # Switches off the change-tracking triggers, and takes the change number
+        # that every record applied here will be passed on to other devices with.
+        cursor.execute('UPDATE sync_state SET applying = 1, seq = seq + 1')
+        local_device, seq = cursor.execute('SELECT device, seq FROM sync_state').fetchone()
+        applied = 0
+        newest_clock = 0
+
+        for table, table_changes in changes['tables'].items():
+            columns = tuple(table_changes['columns'])
+            data_columns = columns[3:]
+            if table not in SYNCED_TABLES or columns[:3] != ('row_uuid', 'clock', 'device') \
+                    or not set(data_columns) <= set(SYNCED_TABLES[table]):
+                raise ValueError(f"Unexpected changes for table '{table}'.")
+            unique_column = SYNC_UNIQUE_COLUMNS.get(table)
+            assignments = ', '.join(f'{column} = ?' for column in columns + ('seq',))
+            for row in table_changes['rows']:
+                row_uuid, clock, device = row[:3]
+                newest_clock = max(newest_clock, clock)
+                tombstone = cursor.execute('''SELECT clock, device FROM tombstones
+                                            WHERE table_name = ? AND row_uuid = ?''', (table, row_uuid)).fetchone()
+                if tombstone and tuple(tombstone) >= (clock, device):
+                    continue
+                local = cursor.execute(f'''SELECT id, clock, device FROM {table} WHERE row_uuid = ?''',
+                                       (row_uuid,)).fetchone()
+                if local is not None and (local[1], local[2]) >= (clock, device):
+                    continue
+                if unique_column in columns:
+                    rival = cursor.execute(f'''SELECT id, row_uuid, clock, device FROM {table}
+                                            WHERE {unique_column} = ? AND row_uuid IS NOT ?''',
+                                           (row[columns.index(unique_column)], row_uuid)).fetchone()
+                    if rival is not None and (rival[2], rival[3]) >= (clock, device):
+                        # The record already here keeps the category or title.
+                        if local is not None:
+                            cursor.execute(f'''DELETE FROM {table} WHERE id = ?''', (local[0],))
+                        record_tombstone(cursor, table, row_uuid, rival[2], rival[3], seq)
+                        applied += 1
+                        continue
+                    if rival is not None:
+                        cursor.execute(f'''DELETE FROM {table} WHERE id = ?''', (rival[0],))
+                        record_tombstone(cursor, table, rival[1], clock, device, seq)
+                if local is not None:
+                    cursor.execute(f'''UPDATE {table} SET {assignments} WHERE id = ?''',
+                                   tuple(row) + (seq, local[0]))
+                else:
+                    cursor.execute(f'''INSERT INTO {table} ({', '.join(columns)}, seq)
+                                    VALUES ({', '.join('?' * (len(columns) + 1))})''', tuple(row) + (seq,))
+                applied += 1
+
+        for table, row_uuid, clock, device in changes['tombstones']:
+            if table not in SYNCED_TABLES:
+                raise ValueError(f"Unexpected changes for table '{table}'.")
+            newest_clock = max(newest_clock, clock)
+            tombstone = cursor.execute('''SELECT clock, device FROM tombstones
+                                        WHERE table_name = ? AND row_uuid = ?''', (table, row_uuid)).fetchone()
+            if tombstone and tuple(tombstone) >= (clock, device):
+                continue
+            local = cursor.execute(f'''SELECT id, clock, device FROM {table} WHERE row_uuid = ?''',
+                                   (row_uuid,)).fetchone()
+            if local is not None:
+                # The record was changed again after it was deleted elsewhere, so it stays.
+                if (local[1], local[2]) > (clock, device):
+                    continue
+                cursor.execute(f'''DELETE FROM {table} WHERE id = ?''', (local[0],))
+            record_tombstone(cursor, table, row_uuid, clock, device, seq)
+            applied += 1
+
+        # Moves the logical clock past everything seen, so later local changes win
+        # over the ones just applied.
+        cursor.execute('UPDATE sync_state SET applying = 0, clock = MAX(clock, ?)', (newest_clock,))
+        cursor.execute('''INSERT INTO sync_peers (device, received_seq, acked_seq) VALUES (?, ?, ?)
+                        ON CONFLICT (device) DO UPDATE SET received_seq = MAX(received_seq, excluded.received_seq),
+                                                           acked_seq = MAX(acked_seq, excluded.acked_seq)''',
+                       (changes['device'], changes['seq'], changes['received'].get(local_device, 0)))
+        db.commit()
+        return applied
+    except BaseException:
+        db.rollback()
+        raise
+
+
+# Function to give a database a new device ID when it turns out to be a file copy
+# of another database with the same one. Records and deletions last changed under
+# the shared ID are moved to the new one, so they are sent to the other copy
+# instead of being taken for changes it already has.
+def give_new_device_id(db):
+    old_device = db.execute('SELECT device FROM sync_state').fetchone()[0]
+    new_device = os.urandom(16).hex()
+    try:
+        db.execute('UPDATE sync_state SET device = ?', (new_device,))
+        for table in SYNCED_TABLES:
+            db.execute(f'''UPDATE {table} SET device = ? WHERE device = ?''', (new_device, old_device))
+        db.execute('''UPDATE tombstones SET device = ? WHERE device = ?''', (new_device, old_device))
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+
+
+# Function to send the changes one database is missing from another, and report
+# how big the changes were and how fast they were applied.
+def send_changes(source, target, target_name):
+    target_device = target.execute('SELECT device FROM sync_state').fetchone()[0]
+    source_device = source.execute('SELECT device FROM sync_state').fetchone()[0]
+    received = target.execute('SELECT received_seq FROM sync_peers WHERE device = ?', (source_device,)).fetchone()
+    data = encode_changes(export_changes(source, received[0] if received else 0, target_device))
+    start_time = time.perf_counter()
+    applied = apply_changes(target, decode_changes(data))
+    elapsed = time.perf_counter() - start_time
+    rate = applied / elapsed if elapsed > 0 else applied
+    print(f'  {target_name}: {applied} change(s) applied from {len(data)} bytes in {elapsed:.2f} seconds ({rate:.0f} changes/s).')
+
+
+# 23 Function to sync this database with another copy of it, in both directions.
+def sync_with_database():
+    other_name = input('\nEnter the file name of the other copy of the database: ')
+    if not os.path.exists(other_name):
+        print(f"\nThe file '{other_name}' could not be found.")
+        return
+    if os.path.abspath(other_name) == os.path.abspath('expense_budget_app.db'):
+        print('\nThe database cannot be synced with itself. Please choose another file.')
+        return
+    create_database_and_tables(other_name)
 
-            confirmation = input(f"\nAre you sure you wish to delete the financial goal with ID '{goal_id}' ({goal_name})?\n\n1. Continue with the deletion.\n2. Disregard and go back to the main menu.\n\nEnter your choice: ")
-            if confirmation == '1':
-                cursor.execute('DELETE FROM goals WHERE id=?', (goal_id,))
-                db.commit()
-                print(f'\nFinancial goal (ID: {goal_id}) - "{goal_name}" with amount {goal_amount} has been deleted successfully.')
-            elif confirmation == '2':
-                print('\nDeletion canceled. Returning to the main menu.')
-            else:
-                print("\nInvalid choice. Please enter either '1' or '2'.")
-    except ValueError:
-        print('\nInvalid input. Please enter a valid goal ID (a number ID).')
+    db = other = None
+    try:
+        db = sqlite3.connect('expense_budget_app.db')
+        other = sqlite3.connect(other_name)
+        # A copy made by copying the database file starts with the same device ID,
+        # so it is given its own before the two are synced.
+        if db.execute('SELECT device FROM sync_state').fetchone() == other.execute('SELECT device FROM sync_state').fetchone():
+            give_new_device_id(other)
+        print('\nSyncing...')
+        send_changes(other, db, 'This database')
+        send_changes(db, other, f"'{other_name}'")
+        print('\nSync completed successfully!')
     except sqlite3.Error as error:
         print('Error:', error)
     finally:
-        db.close()
+        if other is not None:
+            other.close()
+        if db is not None:
+            db.close()
+
+
+# 24 Function to save the changes another device is missing to a sync file.
+def export_sync_changes():
+    db = None
+    try:
+        db = sqlite3.connect('expense_budget_app.db')
+        device = db.execute('SELECT device FROM sync_state').fetchone()[0]
+        peers = db.execute('SELECT device, acked_seq FROM sync_peers').fetchall()
+        print(f'\nThis device ID: {device}')
+        if peers:
+            print('\nDevice ID                          | Changes it has up to')
+            print('------------------------------------------------------------')
+            for peer in peers:
+                print('{:<34} | {}'.format(peer[0], peer[1]))
+        peer_device = input('\nEnter the device ID to export changes for (or press Enter to export all changes): ').strip()
+        acked = dict(peers).get(peer_device, 0)
+        file_name = input('Enter a file name for the sync file: ')
+
+        changes = export_changes(db, acked, peer_device or None)
+        data = encode_changes(changes)
+        with open(file_name, 'wb') as sync_file:
+            sync_file.write(data)
+        count = sum(len(table['rows']) for table in changes['tables'].values()) + len(changes['tombstones'])
+        print(f"\n{count} change(s) saved to '{file_name}' ({len(data)} bytes)!")
+    except (sqlite3.Error, OSError) as error:
+        print('Error:', error)
+    finally:
+        if db is not None:
+            db.close()
+
+
+# 25 Function to apply the changes in a sync file from another device.
+def apply_sync_changes():
+    file_name = input('\nEnter the file name of the sync file: ')
+    db = None
+    try:
+        with open(file_name, 'rb') as sync_file:
+            data = sync_file.read()
+        changes = decode_changes(data)
+        db = sqlite3.connect('expense_budget_app.db')
+        if changes['device'] == db.execute('SELECT device FROM sync_state').fetchone()[0]:
+            # One of the two is a file copy of the other, so they need telling apart.
+            give_new_device_id(db)
+            print('\nThis sync file has the same device ID as this database, so one is a copy of the other.')
+            print('This database has been given a new device ID.')
+        start_time = time.perf_counter()
+        applied = apply_changes(db, changes)
+        elapsed = time.perf_counter() - start_time
+        rate = applied / elapsed if elapsed > 0 else applied
+        print(f"\n{applied} change(s) applied from device '{changes['device']}' ({len(data)} bytes) in {elapsed:.2f} seconds ({rate:.0f} changes/s)!")
+    except (sqlite3.Error, OSError, ValueError, KeyError, zlib.error) as error:
+        print('Error:', error)
+    finally:
+        if db is not None:
+            db.close()
+
+
+# Number of rows fetched at a time by the full-screen view, and how many of
+# those pages it keeps in memory.
+BROWSER_PAGE_SIZE = 200
+BROWSER_CACHED_PAGES = 50
+
+# Searches matching more rows than this are read in sort order from the sort's
+# index, skipping rows that do not match, instead of being sorted for every page.
+BROWSER_SEARCH_SORT_LIMIT = 10000
+
+# Columns shown in the full-screen view, their widths, and what each one sorts
+# on. Every sort ends with the ID so each row has its own place, and matches an
+# index so only the rows on screen have to be read.
+BROWSER_COLUMNS = (('ID', 10), ('Category', 24), ('Amount', 14), ('Date', 12))
+BROWSER_FIELDS = ('id', 'category', 'amount', 'date')
+BROWSER_SORT_KEYS = (('id',), ('category', 'date', 'id'), ('amount', 'id'), ('date', 'id'))
+BROWSER_TABLES = (('expense', 'Expenses'), ('income', 'Income'))
+
+
+# Class to run the full-screen view's queries on a separate thread, so the
+# screen stays responsive while large tables are counted and read.
+class QueryWorker(threading.Thread):
+    def __init__(self, database):
+        super().__init__(daemon=True)
+        self.database = database
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        # Requests from before the latest search or sort are skipped.
+        self.generation = 0
+        self.db = None
+
+    def run(self):
+        self.db = db = sqlite3.connect(self.database)
+        try:
+            while True:
+                request = self.requests.get()
+                if request is None:
+                    break
+                generation, page, sql, parameters = request
+                if generation != self.generation:
+                    continue
+                try:
+                    rows = db.execute(sql, parameters).fetchall()
+                    self.results.put((generation, page, rows))
+                except sqlite3.Error as error:
+                    self.results.put((generation, 'error', str(error)))
+        finally:
+            db.close()
+
+    # Function to stop the query running now, once its results are no longer wanted.
+    def interrupt(self):
+        if self.db is not None:
+            self.db.interrupt()
+
+    def stop(self):
+        self.requests.put(None)
+
+
+# Class holding what the full-screen view is showing: which table, the sort,
+# the search, and the pages of rows read so far.
+class RecordBrowser:
+    def __init__(self, worker):
+        self.worker = worker
+        self.table_index = 0
+        self.sort_column = 3
+        self.descending = True
+        self.search = ''
+        self.searching = False
+        self.selected = 0
+        self.top = 0
+        self.error = None
+        self.reset()
+
+    # Function to forget everything read so far, after the table, sort or search changes.
+    def reset(self):
+        self.worker.generation += 1
+        self.worker.interrupt()
+        self.total = None
+        self.pages = {}
+        self.requested = set()
+        # Pages read in reverse order, which are turned round when they arrive.
+        self.backward = set()
+        self.selected = 0
+        self.top = 0
+        self.error = None
+        conditions, parameters = self.search_conditions(use_index=True)
+        where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        self.send('count', f'SELECT COUNT(*) FROM {self.table()} {where}', parameters)
+
+    def table(self):
+        return BROWSER_TABLES[self.table_index][0]
+
+    # Function to build the search filter. The search matches the start of the
+    # category, which can be looked up on the lowercase category index. That
+    # is only worth it for a small number of matches, since they then have to be
+    # sorted; the + stops SQLite using the index for larger ones.
+    def search_conditions(self, use_index):
+        if not self.search:
+            return [], ()
+        prefix = self.search.lower()
+        column = 'LOWER(category)' if use_index else '+LOWER(category)'
+        return ([f'{column} >= ?', f'{column} < ?'],
+                (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+
+    def send(self, page, sql, parameters):
+        self.worker.requests.put((self.worker.generation, page, sql, parameters))
+
+    # Function to build the query for one page. Pages carry on from the sort
+    # key of the last row of the page before, or back from the first row of the
+    # page after, so reading a page deep in the table costs the same as the
+    # first one. The last page is read backwards from the end of the table.
+    def page_query(self, page):
+        keys = BROWSER_SORT_KEYS[self.sort_column]
+        previous_page = self.pages.get(page - 1)
+        next_page = self.pages.get(page + 1)
+        anchor, backward, limit = None, False, BROWSER_PAGE_SIZE
+        if previous_page:
+            anchor = previous_page[-1]
+        elif next_page:
+            anchor, backward = next_page[0], True
+        elif page > 0 and page == (self.total - 1) // BROWSER_PAGE_SIZE:
+            backward, limit = True, self.total - page * BROWSER_PAGE_SIZE
+        elif page > 0:
+            # Waits for a page next to it to be read first.
+            return None
+
+        conditions, parameters = self.search_conditions(use_index=self.total <= BROWSER_SEARCH_SORT_LIMIT)
+        descending = self.descending != backward
+        offset = 0
+        if anchor is not None:
+            values = tuple(anchor[BROWSER_FIELDS.index(key)] for key in keys)
+            if None in values:
+                # Rows with an empty sort key cannot be compared, so the page is counted to instead.
+                anchor, backward, descending, limit = None, False, self.descending, BROWSER_PAGE_SIZE
+                offset = page * BROWSER_PAGE_SIZE
+            else:
+                conditions.append(f"({', '.join(keys)}) {'<' if descending else '>'} ({', '.join('?' * len(keys))})")
+                parameters += values
+        where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        direction = 'DESC' if descending else 'ASC'
+        order = ', '.join(f'{key} {direction}' for key in keys)
+        return backward, (f'''SELECT id, category, amount, date FROM {self.table()} {where}
+                          ORDER BY {order} LIMIT ? OFFSET ?''', parameters + (limit, offset))
+
+    # Function to ask for any pages between two rows that have not been read yet.
+    def request_rows(self, first, last):
+        if self.total is None:
+            return
+        last = min(last, self.total - 1)
+        for page in range(max(first, 0) // BROWSER_PAGE_SIZE, last // BROWSER_PAGE_SIZE + 1):
+            if page not in self.pages and page not in self.requested:
+                query = self.page_query(page)
+                if query is None:
+                    continue
+                backward, (sql, parameters) = query
+                self.requested.add(page)
+                if backward:
+                    self.backward.add(page)
+                self.send(page, sql, parameters)
+
+    # Function to take in any results the worker has finished.
+    def collect_results(self):
+        changed = False
+        while not self.worker.results.empty():
+            generation, page, rows = self.worker.results.get()
+            if generation != self.worker.generation:
+                continue
+            if page == 'count':
+                self.total = rows[0][0]
+            elif page == 'error':
+                self.error = rows
+            else:
+                self.requested.discard(page)
+                if page in self.backward:
+                    self.backward.discard(page)
+                    rows = rows[::-1]
+                self.pages[page] = rows
+                # Drops the pages furthest from the screen once too many are held.
+                while len(self.pages) > BROWSER_CACHED_PAGES:
+                    current = self.top // BROWSER_PAGE_SIZE
+                    del self.pages[max(self.pages, key=lambda cached: abs(cached - current))]
+            changed = True
+        return changed
+
+    def row(self, index):
+        page = self.pages.get(index // BROWSER_PAGE_SIZE)
+        if page is None or index % BROWSER_PAGE_SIZE >= len(page):
+            return None
+        return page[index % BROWSER_PAGE_SIZE]
+
+    def move(self, rows, height):
+        if not self.total:
+            return
+        self.selected = min(max(self.selected + rows, 0), self.total - 1)
+        if self.selected < self.top:
+            self.top = self.selected
+        elif self.selected >= self.top + height:
+            self.top = self.selected - height + 1
+
+    def sort_by(self, column):
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = False
+        self.reset()
+
+    def draw(self, screen):
+        screen.erase()
+        height, width = screen.getmaxyx()
+        body_height = max(height - 4, 1)
+
+        def write(y, x, text, attributes=0):
+            try:
+                screen.addnstr(y, x, text, max(width - x - 1, 0), attributes)
+            except curses.error:
+                pass
+
+        total = 'counting...' if self.total is None else f'{self.total} rows'
+        arrow = 'v' if self.descending else '^'
+        title = f' {BROWSER_TABLES[self.table_index][1]} ({total}) - sorted by {BROWSER_COLUMNS[self.sort_column][0]} {arrow}'
+        if self.search or self.searching:
+            title += f" - category starts with '{self.search}'" + ('_' if self.searching else '')
+        write(0, 0, title, curses.A_BOLD)
+        header = ' | '.join(f'{number}. {name}'.ljust(size) for number, (name, size) in enumerate(BROWSER_COLUMNS, start=1))
+        write(1, 0, ' ' + header, curses.A_UNDERLINE)
+
+        for line in range(body_height):
+            index = self.top + line
+            if self.total is not None and index >= self.total:
+                break
+            row = self.row(index)
+            if row is None:
+                text = '...'
+            else:
+                text = ' | '.join(str('' if value is None else value).ljust(size)[:size]
+                                  for value, (name, size) in zip(row, BROWSER_COLUMNS))
+            write(line + 2, 0, ' ' + text, curses.A_REVERSE if index == self.selected else 0)
+
+        if self.error:
+            status = f' Error: {self.error}'
+        elif self.searching:
+            status = ' Type to search by category, Enter to finish, Esc to clear.'
+        else:
+            status = ' Up/Down PgUp/PgDn Home/End: move | Tab: expenses/income | 1-4: sort | /: search | q: back to menu'
+        write(height - 1, 0, status, curses.A_REVERSE)
+        screen.refresh()
+
+
+# Function to run the full-screen view until the user leaves it.
+def run_record_browser(screen, database):
+    curses.curs_set(0)
+    screen.keypad(True)
+    # Waits at most a tenth of a second for a key, so finished queries get shown.
+    screen.timeout(100)
+    worker = QueryWorker(database)
+    worker.start()
+    browser = RecordBrowser(worker)
+    try:
+        while True:
+            browser.collect_results()
+            body_height = max(screen.getmaxyx()[0] - 4, 1)
+            # Reads the rows on screen and a page either side, for smooth scrolling.
+            browser.request_rows(browser.top - BROWSER_PAGE_SIZE, browser.top + body_height + BROWSER_PAGE_SIZE)
+            browser.draw(screen)
+
+            key = screen.getch()
+            if key == -1:
+                continue
+            if browser.searching:
+                if key in (10, 13, curses.KEY_ENTER):
+                    browser.searching = False
+                elif key == 27:
+                    browser.searching = False
+                    browser.search = ''
+                    browser.reset()
+                elif key in (8, 127, curses.KEY_BACKSPACE):
+                    browser.search = browser.search[:-1]
+                    browser.reset()
+                elif 32 <= key < 127:
+                    browser.search += chr(key)
+                    browser.reset()
+            elif key in (ord('q'), ord('Q')):
+                break
+            elif key in (curses.KEY_DOWN, ord('j')):
+                browser.move(1, body_height)
+            elif key in (curses.KEY_UP, ord('k')):
+                browser.move(-1, body_height)
+            elif key == curses.KEY_NPAGE:
+                browser.move(body_height, body_height)
+            elif key == curses.KEY_PPAGE:
+                browser.move(-body_height, body_height)
+            elif key == curses.KEY_HOME:
+                browser.move(-browser.selected, body_height)
+            elif key == curses.KEY_END and browser.total:
+                browser.move(browser.total, body_height)
+            elif key == 9:
+                browser.table_index = (browser.table_index + 1) % len(BROWSER_TABLES)
+                browser.reset()
+            elif ord('1') <= key <= ord('4'):
+                browser.sort_by(key - ord('1'))
+            elif key == ord('/'):
+                browser.searching = True
+    finally:
+        worker.stop()
+
+
+# 26 Function to browse expenses and income in a full-screen view.
+def browse_records():
+    if curses is None:
+        print('\nThe full-screen view needs the curses module, which is not available on this computer.')
+        print('(On Windows it can be installed with: pip install windows-curses).')
+        return
+    try:
+        curses.wrapper(run_record_browser, 'expense_budget_app.db')
+    except curses.error as error:
+        print('Error:', error)
+
+
+# 27 Function to scan all expenses and income for likely duplicates and unusual amounts.
+def scan_for_anomalies(shown=20):
+    try:
+        for kind in RECORD_KINDS:
+            start_time = time.perf_counter()
+            records = storage.list_records(kind)
+            duplicates, outliers = scan_records(records)
+            elapsed = time.perf_counter() - start_time
+            rate = len(records) / elapsed if elapsed > 0 else len(records)
+            print(f'\n{kind.capitalize()}: {len(records)} records scanned in {elapsed:.2f} seconds ({rate:.0f} records/s).')
+
+            if not duplicates:
+                print('No likely duplicates found.')
+            else:
+                print(f'\n{len(duplicates)} likely duplicate(s):')
+                print('ID          | Duplicate ID | Category               | Amount       | Dates')
+                print('------------------------------------------------------------------------------------------')
+                for first, second in duplicates[:shown]:
+                    print('{:<11} | {:<12} | {:<22} | {:<12} | {} / {}'.format(first[0], second[0], first[1], first[2], first[3], second[3]))
+            if not outliers:
+                print('No unusual amounts found.')
+            else:
+                print(f'\n{len(outliers)} unusual amount(s):')
+                print('ID          | Category               | Amount       | Date         | Std. deviations above average')
+                print('------------------------------------------------------------------------------------------')
+                for record, score in outliers[:shown]:
+                    print('{:<11} | {:<22} | {:<12} | {:<12} | {:.1f}'.format(record[0], record[1], record[2], record[3], score))
+            if len(duplicates) > shown or len(outliers) > shown:
+                print(f'(Only the first {shown} of each are shown).')
+    except StorageError as error:
+        print('Error:', error)
 
 
 # Program Start.
-print('\n- Welcome to the Expense and Budget Tracker App!')
-print('- When using the app, assume the currency of your choice.')
-print("- Stars '*' represent quick views for total incomes, expenses, goals, etc.")
-main()
+if __name__ == '__main__':
+    print('\n- Welcome to the Expense and Budget Tracker App!')
+    print('- When using the app, assume the currency of your choice.')
+    print("- Stars '*' represent quick views for total incomes, expenses, goals, etc.")
+    main()
@@ -0,0 +1,94 @@
+import random
+import sqlite3
+import time
+import unittest
+from unittest import mock
+
+import Expense_and_Budget_app as app
+from test_support import new_database
+
+
+# Tests that the full-screen view reads every row once, in order, whichever
+# way it pages through the table.
+class RecordBrowserTest(unittest.TestCase):
+    row_count = 1234
+
+    def setUp(self):
+        self.database = new_database(self, 'browser.db')
+        generator = random.Random(3)
+        db = sqlite3.connect(self.database)
+        # Few distinct values, so many rows share a sort key and the ID decides their order.
+        db.executemany('INSERT INTO expense (category, amount, date) VALUES (?, ?, ?)',
+                       [(generator.choice(['food', 'fuel', 'rent', 'travel']), float(generator.randint(1, 20)),
+                         f'2026-01-{generator.randint(1, 9):02}') for _ in range(self.row_count)])
+        db.commit()
+        db.close()
+        self.worker = app.QueryWorker(self.database)
+        self.worker.start()
+        self.addCleanup(self.worker.stop)
+        self.browser = app.RecordBrowser(self.worker)
+
+    def wait(self, condition):
+        deadline = time.monotonic() + 10
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            self.browser.collect_results()
+            self.assertIsNone(self.browser.error)
+            time.sleep(0.001)
+
+    def expected(self, search=''):
+        keys = app.BROWSER_SORT_KEYS[self.browser.sort_column]
+        direction = 'DESC' if self.browser.descending else 'ASC'
+        db = sqlite3.connect(self.database)
+        try:
+            return db.execute(f'''SELECT id, category, amount, date FROM expense WHERE category LIKE ?
+                              ORDER BY {', '.join(f'{key} {direction}' for key in keys)}''', (search + '%',)).fetchall()
+        finally:
+            db.close()
+
+    # Function to page through every row, from the top or from the bottom.
+    def read_all(self, from_end=False):
+        self.wait(lambda: self.browser.total is not None)
+        total = self.browser.total
+        pages = range((total - 1) // app.BROWSER_PAGE_SIZE, -1, -1) if from_end else range(0, (total - 1) // app.BROWSER_PAGE_SIZE + 1)
+        for page in pages:
+            self.browser.request_rows(page * app.BROWSER_PAGE_SIZE, page * app.BROWSER_PAGE_SIZE)
+            self.wait(lambda: page in self.browser.pages)
+        return [self.browser.row(index) for index in range(total)]
+
+    def test_every_sort_read_forwards_and_backwards(self):
+        for column in range(len(app.BROWSER_SORT_KEYS)):
+            for descending in (False, True):
+                self.browser.sort_column, self.browser.descending = column, descending
+                self.browser.reset()
+                self.assertEqual(self.read_all(), self.expected())
+                self.browser.reset()
+                self.assertEqual(self.read_all(from_end=True), self.expected())
+
+    def test_search(self):
+        self.browser.search = 'f'
+        # Both with and without the category index.
+        for limit in (0, self.row_count):
+            with mock.patch.object(app, 'BROWSER_SEARCH_SORT_LIMIT', limit):
+                self.browser.reset()
+                self.assertEqual(self.read_all(), self.expected('f'))
+
+    def test_large_search_is_not_sorted_for_every_page(self):
+        self.browser.search = 'f'
+        patcher = mock.patch.object(app, 'BROWSER_SEARCH_SORT_LIMIT', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.browser.reset()
+        self.read_all()
+        db = sqlite3.connect(self.database)
+        try:
+            for page in (1, 2):
+                sql, parameters = self.browser.page_query(page)[1]
+                plan = ' '.join(row[-1] for row in db.execute('EXPLAIN QUERY PLAN ' + sql, parameters))
+                self.assertNotIn('TEMP B-TREE', plan.upper())
+        finally:
+            db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
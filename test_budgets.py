@@ -0,0 +1,83 @@
+import contextlib
+import datetime
+import io
+import sqlite3
+import unittest
+from unittest import mock
+
+import Expense_and_Budget_app as app
+from test_support import create_database, new_database
+
+
+# Tests for budget periods and rollover, using the in-memory storage.
+class BudgetRolloverTest(unittest.TestCase):
+    def make_storage(self):
+        return app.MemoryStorage()
+
+    def setUp(self):
+        self.storage = self.make_storage()
+        patcher = mock.patch.object(app, 'storage', self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.today = datetime.date.today()
+        self.start, _ = app.budget_period_bounds('monthly', self.today)
+        self.previous_start, _ = app.budget_period_bounds('monthly', self.start - datetime.timedelta(days=1))
+
+    def available(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            app.view_budget_for_all_categories()
+        row = output.getvalue().strip().splitlines()[-1]
+        return float(row.split('|')[4])
+
+    def test_nothing_carried_over_from_before_the_budget_existed(self):
+        self.storage.set_budget('food', 300.0, 'monthly', 1)
+        self.assertEqual(self.available(), 300.0)
+
+    def test_unspent_budget_carried_over(self):
+        self.storage.set_budget('food', 300.0, 'monthly', 1, self.previous_start)
+        self.storage.add_record('expense', 'food', 120.0, self.previous_start.isoformat())
+        self.assertEqual(self.available(), 480.0)
+
+    def test_changing_the_period_starts_the_budget_again(self):
+        self.storage.set_budget('food', 300.0, 'monthly', 1, self.previous_start)
+        self.storage.update_budget('food', 70.0, 'weekly', 1)
+        self.assertEqual(self.storage.get_budget('food')[4], self.today.isoformat())
+        self.assertEqual(self.available(), 70.0)
+        self.storage.update_budget('food', 80.0, 'weekly', 1, self.previous_start)
+        self.assertEqual(self.storage.get_budget('food')[4], self.today.isoformat())
+
+
+# The same tests against the SQLite storage, and ones for budgets synced without a start date.
+class SQLiteBudgetRolloverTest(BudgetRolloverTest):
+    def make_storage(self):
+        self.database = new_database(self, 'budgets.db')
+        storage = app.SQLiteStorage(self.database)
+        self.addCleanup(storage.close)
+        return storage
+
+    def test_budget_without_a_start_date(self):
+        # As applied from a sync file made before start dates were recorded.
+        self.storage.db.execute("INSERT INTO budgets (category, budget, period, rollover) VALUES ('food', 300.0, 'monthly', 1)")
+        self.storage.db.commit()
+        self.assertEqual(self.available(), 300.0)
+        self.storage.set_budget('food', 250.0, 'monthly', 1)
+        self.assertEqual(self.storage.get_budget('food')[4], self.today.isoformat())
+
+    def test_filling_in_start_dates_is_synced(self):
+        with mock.patch.object(app, 'MIGRATIONS', app.MIGRATIONS[:-1]):
+            self.database = new_database(self, 'before.db')
+        db = sqlite3.connect(self.database)
+        self.addCleanup(db.close)
+        db.execute("INSERT INTO budgets (category, budget) VALUES ('food', 300.0)")
+        db.commit()
+        seq_before = db.execute('SELECT seq FROM budgets').fetchone()[0]
+        create_database(self.database)
+        started, seq = db.execute('SELECT started, seq FROM budgets').fetchone()
+        self.assertEqual(started, self.today.isoformat())
+        self.assertGreater(seq, seq_before)
+        changes = app.export_changes(db, seq_before)
+        self.assertEqual(len(changes['tables']['budgets']['rows']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
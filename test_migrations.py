@@ -0,0 +1,53 @@
+import contextlib
+import io
+import os
+import sqlite3
+import unittest
+from unittest import mock
+
+import Expense_and_Budget_app as app
+from test_support import create_database, make_directory
+
+
+# Tests for bringing a database from before the migrations up to date.
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.database = os.path.join(make_directory(self), 'legacy.db')
+        db = sqlite3.connect(self.database)
+        for statement in app.MIGRATIONS[0][2]:
+            db.execute(statement)
+        db.executemany('INSERT INTO expense (category, amount, date) VALUES (?, ?, ?)',
+                       [(('food', 'rent', 'fun')[number % 3], float(number * 7 % 23), '2026-01-01') for number in range(95)])
+        db.execute('PRAGMA user_version = 1')
+        db.commit()
+        db.close()
+
+    def test_backfills_in_batches(self):
+        output = io.StringIO()
+        with mock.patch.object(app, 'MIGRATION_BATCH_SIZE', 10), contextlib.redirect_stdout(output):
+            app.create_database_and_tables(self.database)
+        self.assertIn('90 of 95 rows in expense done.', output.getvalue())
+        db = sqlite3.connect(self.database)
+        try:
+            self.assertEqual(db.execute('PRAGMA user_version').fetchone()[0], app.LATEST_SCHEMA_VERSION)
+            rows = db.execute('SELECT id, category, amount, date, row_uuid FROM expense').fetchall()
+            self.assertEqual([row[4] for row in rows], [app.content_row_uuid('expense', row[:4]) for row in rows])
+            for category, count, mean, m2 in db.execute("SELECT category, count, mean, m2 FROM category_stats WHERE kind = 'expense'"):
+                amounts = [row[2] for row in rows if row[1] == category]
+                expected_mean = sum(amounts) / len(amounts)
+                self.assertEqual(count, len(amounts))
+                self.assertAlmostEqual(mean, expected_mean)
+                self.assertAlmostEqual(m2, sum((amount - expected_mean) ** 2 for amount in amounts))
+        finally:
+            db.close()
+
+    def test_up_to_date_database_is_left_alone(self):
+        create_database(self.database)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            app.create_database_and_tables(self.database)
+        self.assertEqual(output.getvalue(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import Expense_and_Budget_app as app
+
+
+# Tests for the scan for likely duplicates and unusual amounts.
+class ScanRecordsTest(unittest.TestCase):
+    def duplicate_ids(self, records):
+        duplicates, outliers = app.scan_records(records)
+        return [(first[0], second[0]) for first, second in duplicates]
+
+    def test_duplicates_within_the_window(self):
+        records = [(1, 'food', 10.0, '2026-01-01'), (2, 'food', 10.0, '2026-01-04'),
+                   (3, 'food', 10.0, '2026-01-08'), (4, 'food', 12.0, '2026-01-08'),
+                   (5, 'fuel', 10.0, '2026-01-08'), (6, 'food', 10.0, '2025-12-30')]
+        self.assertEqual(self.duplicate_ids(records), [(1, 2), (1, 6)])
+
+    def test_each_record_is_linked_to_the_latest_earlier_match(self):
+        records = [(1, 'food', 10.0, '2026-01-01'), (2, 'food', 10.0, '2026-01-03'), (3, 'food', 10.0, '2026-01-02')]
+        self.assertEqual(self.duplicate_ids(records), [(1, 2), (2, 3)])
+
+    def test_identical_records_give_one_pair_each(self):
+        records = [(number, 'food', 10.0, '2026-01-01') for number in range(1, 3001)]
+        self.assertEqual(self.duplicate_ids(records), [(number, number + 1) for number in range(1, 3000)])
+
+    def test_dates_not_in_iso_form_match_exactly(self):
+        records = [(1, 'food', 10.0, '01/01/2026'), (2, 'food', 10.0, '01/01/2026'), (3, 'food', 10.0, '02/01/2026')]
+        self.assertEqual(self.duplicate_ids(records), [(1, 2)])
+
+    def outlier_ids(self, records):
+        duplicates, outliers = app.scan_records(records)
+        return [record[0] for record, score in outliers]
+
+    def test_unusual_amounts(self):
+        records = [(number, 'food', 10.0 + number % 3, f'2026-01-{number:02}') for number in range(1, 21)]
+        records.append((21, 'food', 500.0, '2026-01-25'))
+        self.assertEqual(self.outlier_ids(records), [21])
+
+    def test_unusual_amount_in_a_small_category(self):
+        records = [(number, 'food', 9.0 + number % 3, f'2026-01-{number:02}') for number in range(1, 10)]
+        records.append((10, 'food', 1e9, '2026-01-20'))
+        self.assertEqual(self.outlier_ids(records), [10])
+        # Too few other records to tell.
+        self.assertEqual(self.outlier_ids(records[5:]), [])
+
+    def test_unusual_amount_when_every_other_amount_is_the_same(self):
+        records = [(number, 'rent', 1200.0, f'2026-{number:02}-01') for number in range(1, 11)]
+        self.assertEqual(self.outlier_ids(records), [])
+        records.append((11, 'rent', 50000.0, '2026-11-01'))
+        self.assertEqual(self.outlier_ids(records), [11])
+
+
+# Tests for scoring a new record before it is added.
+class OutlierScoreTest(unittest.TestCase):
+    def stats(self, amounts):
+        stats = [0, 0.0, 0.0]
+        for amount in amounts:
+            app.add_to_stats(stats, amount)
+        return stats
+
+    def test_every_amount_the_same(self):
+        stats = self.stats([1200.0] * 10)
+        self.assertGreaterEqual(app.outlier_score(stats, 50000.0), app.OUTLIER_STANDARD_DEVIATIONS)
+        self.assertLess(app.outlier_score(stats, 1250.0), app.OUTLIER_STANDARD_DEVIATIONS)
+        self.assertIsNone(app.outlier_score(self.stats([0.0] * 10), 5.0))
+
+    def test_too_few_records(self):
+        self.assertIsNone(app.outlier_score(self.stats([10.0, 11.0, 12.0, 10.0]), 1e9))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import datetime
+import os
+import random
+import time
+import unittest
+
+import Expense_and_Budget_app as app
+from test_support import new_database
+
+
+CATEGORIES = ('food', 'rent', 'travel', 'bills', 'fun')
+FIRST_DAY = datetime.date(2024, 1, 1)
+
+
+# Function to make the same random records every time.
+def make_records(record_count):
+    generator = random.Random(42)
+    return [('income' if number % 5 == 0 else 'expense', generator.choice(CATEGORIES),
+             round(generator.uniform(1, 500), 2), (FIRST_DAY + datetime.timedelta(days=generator.randrange(730))).isoformat())
+            for number in range(record_count)]
+
+
+# Tests that every storage backend gives the same results for the same operations.
+class StorageBackendsTest(unittest.TestCase):
+    record_count = 500
+
+    def setUp(self):
+        database = new_database(self, 'storage.db')
+        self.backends = {'SQLite': app.SQLiteStorage(database), 'Memory': app.MemoryStorage()}
+        for backend in self.backends.values():
+            self.addCleanup(backend.close)
+        self.records = make_records(self.record_count)
+        self.timings = {}
+        self.run_on_all('add', lambda backend: [backend.add_record(*record) for record in self.records])
+
+    # Function to run an operation on every backend, check they all gave the same
+    # result, and return it.
+    def run_on_all(self, name, operation):
+        results = {}
+        for backend_name, backend in self.backends.items():
+            start_time = time.perf_counter()
+            results[backend_name] = operation(backend)
+            self.timings.setdefault(name, {})[backend_name] = time.perf_counter() - start_time
+        expected = results['SQLite']
+        for backend_name, result in results.items():
+            self.assertEqual(result, expected, f'{backend_name} differs from SQLite for {name}')
+        return expected
+
+    def test_storage_is_abstract(self):
+        with self.assertRaises(TypeError):
+            app.Storage()
+
+    def test_list_and_get(self):
+        self.run_on_all('list', lambda backend: [backend.list_records(kind) for kind in app.RECORD_KINDS])
+        self.run_on_all('list by category', lambda backend: [backend.list_records('expense', category.upper())
+                                                             for category in CATEGORIES])
+        found = self.run_on_all('get', lambda backend: [backend.get_record('expense', record_id)
+                                                        for record_id in (1, 2, self.record_count, self.record_count + 1, 'x')])
+        self.assertIsNone(found[-1])
+
+    def test_update_and_delete(self):
+        changed = self.run_on_all('update', lambda backend: [
+            backend.update_record('expense', 2, 'amount', 12.5),
+            backend.update_record('expense', 3, 'category', 'travel'),
+            backend.update_record('expense', 4, 'date', '2025-06-30'),
+            backend.update_record('income', self.record_count + 1, 'amount', 1.0)])
+        self.assertEqual(changed[-1], False)
+        self.run_on_all('delete', lambda backend: [backend.delete_record(app.RECORD_KINDS[record_id % 2], record_id)
+                                                   for record_id in range(1, self.record_count + 1, 7)])
+        self.run_on_all('list after changes', lambda backend: [backend.list_records(kind) for kind in app.RECORD_KINDS])
+        self.test_totals_and_statistics()
+
+    def test_totals_and_statistics(self):
+        self.run_on_all('totals', lambda backend: [round(backend.total(kind), 2) for kind in app.RECORD_KINDS])
+        self.run_on_all('category stats', lambda backend: [
+            tuple(round(value, 6) for value in backend.category_stats(kind, category))
+            for kind in app.RECORD_KINDS for category in CATEGORIES])
+        periods = [app.budget_period_bounds(period, FIRST_DAY + datetime.timedelta(days=offset))
+                   for period in app.BUDGET_PERIODS for offset in range(0, 730, 30)]
+        self.run_on_all('period totals', lambda backend: [
+            round(backend.total_in_period('expense', category, start, end), 2)
+            for category in CATEGORIES for start, end in periods])
+
+    def test_similar_records(self):
+        self.run_on_all('duplicates', lambda backend: [
+            backend.find_similar_records(kind, category, amount, date, app.DUPLICATE_WINDOW_DAYS)
+            for kind, category, amount, date in self.records[::50]])
+
+    def test_budgets(self):
+        def budgets(backend):
+            backend.set_budget('food', 300.0, 'monthly', 1)
+            backend.set_budget('rent', 1200.0)
+            backend.set_budget('food', 350.0, 'weekly', 0)
+            found = [backend.get_budget('FOOD'), backend.get_budget('missing')]
+            changed = [backend.update_budget('Rent', 1100.0, 'yearly', 1), backend.update_budget('missing', 1.0, 'monthly', 0)]
+            deleted = [backend.delete_budget('food'), backend.delete_budget('food')]
+            return found, changed, deleted, backend.list_budgets()
+        found, changed, deleted, remaining = self.run_on_all('budgets', budgets)
+        self.assertEqual(found[0][:4], ('food', 350.0, 'weekly', 0))
+        self.assertEqual((changed, deleted), ([True, False], [True, False]))
+        self.assertEqual([budget[:4] for budget in remaining], [('rent', 1100.0, 'yearly', 1)])
+
+    def test_goals(self):
+        def goals(backend):
+            backend.set_goal('car', 5000.0, '2026-01-01')
+            backend.set_goal('holiday', 1500.0, '2025-07-01')
+            backend.set_goal('car', 6000.0, '2026-06-01')
+            outcomes = [backend.update_goal(2, goal='trip', amount=1800.0), backend.update_goal(99, amount=1.0)]
+            try:
+                backend.update_goal(1, goal='trip')
+                outcomes.append('renamed')
+            except app.StorageError:
+                outcomes.append('error')
+            outcomes += [backend.get_goal(1), backend.get_goal('2'), backend.delete_goal(1), backend.delete_goal(1)]
+            return outcomes, backend.list_goals(), backend.total_goals()
+        outcomes, remaining, total = self.run_on_all('goals', goals)
+        self.assertEqual(outcomes[2], 'error')
+        self.assertEqual(remaining, [(2, 'trip', 1800.0, '2025-07-01')])
+        self.assertEqual(total, 1800.0)
+
+
+# Compares how long each backend takes. Only run when STORAGE_TIMINGS is set,
+# for example: STORAGE_TIMINGS=20000 python -m unittest test_storage
+@unittest.skipUnless(os.environ.get('STORAGE_TIMINGS'), 'set STORAGE_TIMINGS to compare the backends\' speed')
+class StorageTimingsTest(StorageBackendsTest):
+    record_count = int(os.environ.get('STORAGE_TIMINGS') or 0)
+
+    def test_timings(self):
+        for check in (self.test_list_and_get, self.test_update_and_delete, self.test_similar_records,
+                      self.test_budgets, self.test_goals):
+            check()
+        print('\nOperation          | ' + ' | '.join('{:<12}'.format(name + ' (s)') for name in self.backends))
+        for operation, timings in self.timings.items():
+            print('{:<18} | '.format(operation) + ' | '.join('{:<12.4f}'.format(timings[name]) for name in self.backends))
+
+
+if __name__ == '__main__':
+    unittest.main()
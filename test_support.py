@@ -0,0 +1,26 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+import Expense_and_Budget_app as app
+
+
+# Function to make a folder for a test's files, which is removed when the test ends.
+def make_directory(test):
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory)
+    return directory
+
+
+# Function to create or update a database without printing the migration messages.
+def create_database(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.create_database_and_tables(path)
+    return path
+
+
+# Function to create an up-to-date database in a new folder for a test, and return its path.
+def new_database(test, name='test.db'):
+    return create_database(os.path.join(make_directory(test), name))
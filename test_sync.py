@@ -0,0 +1,167 @@
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import unittest
+from unittest import mock
+
+import Expense_and_Budget_app as app
+from test_support import create_database, make_directory
+
+
+# Tests that syncing two copies of a database leaves them with the same records.
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = make_directory(self)
+        self.connections = []
+
+    def tearDown(self):
+        for db in self.connections:
+            db.close()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def create(self, name):
+        create_database(self.path(name))
+        return self.connect(name)
+
+    def copy(self, source, name):
+        shutil.copyfile(self.path(source), self.path(name))
+        return self.connect(name)
+
+    def connect(self, name):
+        db = sqlite3.connect(self.path(name))
+        self.connections.append(db)
+        return db
+
+    def sync(self, first, second):
+        if first.execute('SELECT device FROM sync_state').fetchone() == second.execute('SELECT device FROM sync_state').fetchone():
+            app.give_new_device_id(second)
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.send_changes(second, first, 'first')
+            app.send_changes(first, second, 'second')
+
+    def contents(self, db):
+        return {table: sorted(db.execute(f'''SELECT {', '.join(columns)} FROM {table}''').fetchall())
+                for table, columns in app.SYNCED_TABLES.items()}
+
+    def assertSameContents(self, first, second):
+        self.assertEqual(self.contents(first), self.contents(second))
+
+    def test_new_records_are_synced_both_ways(self):
+        first = self.create('first.db')
+        second = self.create('second.db')
+        first.execute("INSERT INTO expense (category, amount, date) VALUES ('food', 12.5, '2026-01-02')")
+        second.execute("INSERT INTO income (category, amount, date) VALUES ('salary', 900.0, '2026-01-01')")
+        first.commit()
+        second.commit()
+        self.sync(first, second)
+        self.assertSameContents(first, second)
+        self.assertEqual(first.execute('SELECT COUNT(*) FROM expense').fetchone()[0], 1)
+        self.assertEqual(first.execute('SELECT COUNT(*) FROM income').fetchone()[0], 1)
+
+    def test_copies_upgraded_separately_do_not_duplicate_records(self):
+        # A database from before syncing was added, copied and then upgraded on each device.
+        baseline = self.connect('baseline.db')
+        for statement in app.MIGRATIONS[0][2]:
+            baseline.execute(statement)
+        baseline.executemany('INSERT INTO expense (category, amount, date) VALUES (?, ?, ?)',
+                             [('food', 10.0, '2026-01-01'), ('rent', 500.0, '2026-01-01')])
+        baseline.execute("INSERT INTO budgets (category, budget) VALUES ('food', 300.0)")
+        baseline.execute('PRAGMA user_version = 1')
+        baseline.commit()
+        baseline.close()
+        shutil.copyfile(self.path('baseline.db'), self.path('copy.db'))
+        first = self.create('baseline.db')
+        second = self.create('copy.db')
+        self.sync(first, second)
+        self.sync(first, second)
+        self.assertSameContents(first, second)
+        self.assertEqual(first.execute('SELECT COUNT(*) FROM expense').fetchone()[0], 2)
+        self.assertEqual(first.execute('SELECT COUNT(*) FROM budgets').fetchone()[0], 1)
+
+    def test_changes_made_in_a_file_copy_are_synced(self):
+        original = self.create('original.db')
+        original.execute("INSERT INTO expense (category, amount, date) VALUES ('food', 10.0, '2026-01-01')")
+        original.commit()
+        copy = self.copy('original.db', 'copy.db')
+        copy.execute("INSERT INTO expense (category, amount, date) VALUES ('travel', 80.0, '2026-01-03')")
+        copy.execute("UPDATE expense SET amount = 11.0 WHERE category = 'food'")
+        copy.commit()
+        original.execute("INSERT INTO income (category, amount, date) VALUES ('salary', 900.0, '2026-01-01')")
+        original.commit()
+        self.sync(original, copy)
+        self.assertSameContents(original, copy)
+        self.assertEqual(sorted(original.execute('SELECT category, amount FROM expense').fetchall()),
+                         [('food', 11.0), ('travel', 80.0)])
+        self.assertEqual(copy.execute('SELECT COUNT(*) FROM income').fetchone()[0], 1)
+
+    def test_sync_file_from_a_file_copy_is_applied(self):
+        original = self.create('expense_budget_app.db')
+        copy = self.copy('expense_budget_app.db', 'copy.db')
+        copy.execute("INSERT INTO expense (category, amount, date) VALUES ('travel', 80.0, '2026-01-03')")
+        copy.commit()
+        with open(self.path('changes.sync'), 'wb') as sync_file:
+            sync_file.write(app.encode_changes(app.export_changes(copy)))
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            with mock.patch('builtins.input', return_value='changes.sync'), contextlib.redirect_stdout(io.StringIO()):
+                app.apply_sync_changes()
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(original.execute('SELECT category, amount FROM expense').fetchall(), [('travel', 80.0)])
+        self.assertNotEqual(original.execute('SELECT device FROM sync_state').fetchone(),
+                            copy.execute('SELECT device FROM sync_state').fetchone())
+
+    def test_goal_renamed_to_a_goal_created_elsewhere(self):
+        first = self.create('first.db')
+        second = self.create('second.db')
+        first.execute("INSERT INTO goals (goal, amount, date) VALUES ('car', 5000.0, '2027-01-01')")
+        first.commit()
+        self.sync(first, second)
+        first.execute("UPDATE goals SET goal = 'trip' WHERE goal = 'car'")
+        first.commit()
+        second.execute("INSERT INTO goals (goal, amount, date) VALUES ('trip', 1500.0, '2026-08-01')")
+        second.commit()
+        self.sync(first, second)
+        self.assertSameContents(first, second)
+        self.assertEqual(first.execute('SELECT COUNT(*) FROM goals WHERE goal = ?', ('trip',)).fetchone()[0], 1)
+        # Later syncs carry on working, and changes made after the conflict still arrive.
+        second.execute("INSERT INTO goals (goal, amount, date) VALUES ('house', 90000.0, '2030-01-01')")
+        second.commit()
+        self.sync(first, second)
+        self.sync(first, second)
+        self.assertSameContents(first, second)
+        self.assertEqual(first.execute('SELECT COUNT(*) FROM goals').fetchone()[0], 2)
+
+    def test_budget_set_on_both_devices(self):
+        first = self.create('first.db')
+        second = self.create('second.db')
+        first.execute("INSERT INTO budgets (category, budget, period, rollover) VALUES ('food', 300.0, 'monthly', 0)")
+        first.commit()
+        second.execute("INSERT INTO budgets (category, budget, period, rollover) VALUES ('food', 250.0, 'monthly', 0)")
+        second.commit()
+        self.sync(first, second)
+        self.assertSameContents(first, second)
+        self.assertEqual(first.execute('SELECT COUNT(*) FROM budgets').fetchone()[0], 1)
+
+    def test_record_changed_on_one_device_and_deleted_on_the_other(self):
+        first = self.create('first.db')
+        second = self.create('second.db')
+        first.execute("INSERT INTO expense (category, amount, date) VALUES ('food', 10.0, '2026-01-01')")
+        first.commit()
+        self.sync(first, second)
+        first.execute('DELETE FROM expense')
+        first.commit()
+        second.execute('UPDATE expense SET amount = 12.0')
+        second.commit()
+        self.sync(first, second)
+        self.sync(first, second)
+        self.assertSameContents(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()